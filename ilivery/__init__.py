@@ -18,6 +18,10 @@ TEMPLATE_DIR = RESOURCE_DIR / "templates"
 DECAL_DIR = RESOURCE_DIR / "decals"
 TEXTURE_DIR = RESOURCE_DIR / "textures"
 LAYER_CACHE_DIR = ROOT.parent / ".layer_cache"
+CFUNC_CACHE_DIR = ROOT.parent / ".cfunc_cache"
+DECAL_ATLAS_DIR = ROOT.parent / ".decal_atlas"
+TEXTURE_CACHE_DIR = ROOT.parent / ".texture_cache"
+OUTPUT_MANIFEST_PATH = ROOT.parent / ".output_manifest.json"
 
 import loggerado
 
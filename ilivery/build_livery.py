@@ -7,8 +7,8 @@ import shutil
 from pathlib import Path
 
 from ilivery.layer import Layer
-from ilivery import TEMPLATE_DIR, LAYER_CACHE_DIR, utils
-from ilivery import utils
+from ilivery import TEMPLATE_DIR, LAYER_CACHE_DIR, CFUNC_CACHE_DIR, utils
+from ilivery import output, utils
 from ilivery.layers import layer_from_config
 
 logger = logging.getLogger(__name__)
@@ -18,20 +18,49 @@ def _get_cache_path(path, sha):
     return path / sha[:2] / sha[2:]
 
 
+def _config_key(config):
+    return json.dumps(config.model_dump(mode="json"), sort_keys=True)
+
+
 class Livery:
+    """
+    A livery, built from a config
+
+    Built sections and layers are kept, keyed by their configs. After `update` with an edited config, `build`
+    only renders the sections and layers that changed.
+    """
+
     def __init__(self, config, no_cache):
         self._config = config
-
-        self._template_path = TEMPLATE_DIR / config.template / "segmented.psd"
-        self._template, template_hash, template_size = utils.psd.load_layers(self._template_path)
         self._no_cache = no_cache
 
         self._layers = []
 
-        self._size = template_size
+        self._load_template()
         self._built = False
         # self._compute_cache(template_hash)
 
+    def _load_template(self):
+        self._template_path = TEMPLATE_DIR / self._config.template / "segmented.psd"
+        self._template, template_hash, template_size = utils.psd.load_layers(self._template_path)
+        self._size = template_size
+
+        self._section_cache = {}
+        self._layer_cache = {}
+
+    def update(self, config):
+        """
+        Replace the livery config. The template, and built sections and layers, are kept for the next build,
+        unless the template has changed
+        """
+        template_changed = config.template != self._config.template
+
+        self._config = config
+        self._built = False
+
+        if template_changed:
+            self._load_template()
+
     def _compute_cache(self, template_hash):
         hashes = {"template": template_hash, "layers": []}
         last_hash = template_hash
@@ -75,9 +104,25 @@ class Livery:
 
         kwargs = {
             "template_path": self._template_path,
+            "cfunc_cache_dir": CFUNC_CACHE_DIR,
         }
 
+        # Sections and layers from the last build, reused if their configs are unchanged. Only those still in
+        # the config are kept for the next build
+        section_cache, self._section_cache = self._section_cache, {}
+        layer_cache, self._layer_cache = self._layer_cache, {}
+
         for i, section_config in enumerate(self._config.sections):
+            section_key = _config_key(section_config)
+            layer_keys = [(section_config.section, _config_key(c)) for c in section_config.layers]
+
+            if section_key in section_cache:
+                logger.info(f"SECTION [{i+1}/{len(self._config.sections)}] unchanged")
+                section, dest = self._section_cache[section_key] = section_cache[section_key]
+                self._layer_cache.update({k: layer_cache[k] for k in layer_keys if k in layer_cache})
+                livery.composite(section, dest)
+                continue
+
             logger.info(f"SECTION [{i+1}/{len(self._config.sections)}]")
             # Get the section, if required
             mask = None
@@ -88,28 +133,32 @@ class Livery:
                 mask, bbox = utils.psd.get_section_mask(section_config.section, self._template)
                 dest = (bbox[0], bbox[1])
                 size = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+                # Crop mask to bbox
+                mask = mask.crop(bbox)
 
-            layer_kwargs = {**kwargs, **{"size": size}}
+            layer_kwargs = {**kwargs, **{"size": size, "mask": mask, "origin": dest}}
             section = Layer(size)
 
             # Build all layers
-            for j, layer_config in enumerate(section_config.layers):
-                logger.info(f"  LAYER [{j+1}/{len(section_config.layers)}]")
-                # Build layer
-                layer = layer_from_config(layer_config, **layer_kwargs)
+            for j, (layer_config, layer_key) in enumerate(zip(section_config.layers, layer_keys)):
+                layer = layer_cache.get(layer_key)
+                if layer is None:
+                    logger.info(f"  LAYER [{j+1}/{len(section_config.layers)}]")
+                    # Build layer
+                    layer = layer_from_config(layer_config, **layer_kwargs)
+                self._layer_cache[layer_key] = layer
 
-                # Flatten
-                section = section.flatten(layer)
+                # Flatten, in place into the section's accumulator
+                section.composite(layer)
 
             # Mask the section, if required
             if mask:
-                # Crop mask to bbox
-                mask = mask.crop(bbox)
                 # Mask section
                 section = section.mask(mask)
 
-            # Flatten section into livery
-            livery = livery.flatten(section, dest)
+            # Flatten section into livery, in place since the livery is built from scratch
+            self._section_cache[section_key] = (section, dest)
+            livery.composite(section, dest)
 
         if self._config.final_mask:
             mask, bbox = utils.psd.get_section_mask(self._config.final_mask, self._template)
@@ -135,9 +184,7 @@ class Livery:
         paint_path = path / f"car_{self._config.iracing_output.car_number}.tga"
         spec_path = path / f"car_spec_{self._config.iracing_output.car_number}.tga"
 
-        print(f"Saving paint to path: {paint_path}")
-        self._livery._paint.save(fp=paint_path, format="tga", compression="tga_rle")
-        self._livery._spec.save(fp=spec_path, format="tga", compression="tga_rle")
+        return output.write_tgas({paint_path: self._livery._paint, spec_path: self._livery._spec})
 
 
 def build_livery(config, no_cache):
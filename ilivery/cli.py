@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 
-from pathlib import Path
 import click
 
 import logging
@@ -10,29 +9,33 @@ logger = logging.getLogger(__name__)
 
 def _load_config(config_path):
     logger.info("Loading config")
-    from ilivery.config.livery_config import LiveryConfig
+    from ilivery.config.livery_config import load_config
 
-    config_path = Path(config_path)
+    return load_config(config_path)
 
-    if config_path.suffix == ".jsonnet":
-        import _jsonnet
-        import json
 
-        config = json.loads(_jsonnet.evaluate_file(str(config_path)))
-    else:
-        raise ValueError(f"Unknown suffix: {config_path.suffix}")
+class _DefaultGroup(click.Group):
+    """Command group that runs `build` when the first argument is not a command, so `ilivery <config>` works"""
 
-    config = LiveryConfig.model_validate(config)
-    return config
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args = ["build", *args]
+        return super().parse_args(ctx, args)
 
 
-@click.command()
+@click.group(cls=_DefaultGroup)
+def main():
+    pass
+
+
+@main.command()
 @click.argument("config", type=click.Path())
 @click.option("--no-cache", is_flag=True)
 @click.option("--show", is_flag=True)
 @click.option("--show-spec", is_flag=True)
 @click.option("--save", is_flag=True)
-def main(config, no_cache, show, show_spec, save):
+def build(config, no_cache, show, show_spec, save):
+    """Build a livery from a config"""
     config = _load_config(config)
 
     from ilivery.build_livery import build_livery
@@ -50,5 +53,43 @@ def main(config, no_cache, show, show_spec, save):
         livery.save()
 
 
+@main.command()
+@click.argument("config", type=click.Path(exists=True))
+@click.option("--save", is_flag=True, help="Save the livery to iRacing after each build")
+@click.option("--interval", default=0.5, show_default=True, help="Polling interval, in seconds")
+def watch(config, save, interval):
+    """Rebuild a livery whenever its config changes, only re-rendering what changed"""
+    from ilivery.watch import watch as watch_livery
+    from ilivery import utils
+
+    watch_livery(config, save=save and utils.os.in_wsl(), interval=interval)
+
+
+@main.group()
+def decals():
+    """Manage the decal library"""
+
+
+@decals.command()
+def pack():
+    """Pack the decal library into a memory mapped atlas"""
+    from ilivery.decals import pack as pack_decals
+
+    pack_decals()
+
+
+@main.group()
+def textures():
+    """Manage the texture library"""
+
+
+@textures.command(name="pack")
+def pack_textures():
+    """Preprocess every texture into the memory mapped texture cache"""
+    from ilivery.textures import pack
+
+    pack()
+
+
 if __name__ == "__main__":
     main()
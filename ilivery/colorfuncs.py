@@ -1,60 +1,197 @@
 #!/usr/bin/env python3
 
-import functools
+import hashlib
+import os
+from pathlib import Path
 
 import numpy as np
-import opensimplex as simplex
+
+from ilivery import utils
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default budget of the on-disk color function cache
+CFUNC_CACHE_BYTES = 2**30
 
 
 def _standardize(data, range):
-    data = (data - data.min()) / (data.max() - data.min())
+    """Standardize float32 data to [0,1], then map to range, in place"""
+    data_min = data.min()
+    data -= data_min
+    data /= data.max()
 
-    data = (data - range[0]) * (range[1] - range[0])
+    data -= range[0]
+    data *= range[1] - range[0]
 
     return data
 
 
-class ColorFunction:
-    def __call__(self, x, y):
-        pass
+def _points_key(x, y):
+    """Content hash of sample points, from their values, shapes and dtypes"""
+    digest = hashlib.sha256()
+    for a in (x, y):
+        a = np.ascontiguousarray(a)
+        digest.update(f"{a.dtype.str}{a.shape}".encode())
+        digest.update(a)
 
+    return digest.hexdigest()
 
-class GradientCFunc:
-    def __init__(self, config):
-        self._config = config
-        self._direction = np.array(self._config.direction).reshape(2, 1)
-        self._direction = self._direction / np.linalg.norm(self._direction)
 
-    def __call__(self, x, y, standardize=True):
-        points = np.array([x, y]).T
+class CFuncCache:
+    """
+    Memo of color function results, keyed by color function config and sample points
 
-        out = (points @ self._direction).reshape(x.shape)
+    Color functions built with the same cache share results for identical configs evaluated on the same
+    points, for example a noise function used by both face_cfunc and facespec_cfunc, or repeated inside a
+    composed function. Points are identified by their contents, so arrays modified in place, or new arrays
+    with equal points, are handled correctly.
 
-        out = _standardize(out, self._config.range)
+    If a path is given, results of expensive color functions are also saved there, keyed by a hash of the
+    config and the sample points, and memory-mapped when the same field is needed again by a later build.
+    Least recently used files are removed once the saved results exceed max_bytes.
+    """
+
+    def __init__(self, path=None, max_bytes=CFUNC_CACHE_BYTES):
+        self._results = {}
+        self._path = None if path is None else Path(path)
+        self.max_bytes = max_bytes
+
+    def _disk_path(self, cfunc, points_key):
+        digest = hashlib.sha256(cfunc.key.encode())
+        digest.update(points_key.encode())
+
+        return self._path / f"{digest.hexdigest()}.npy"
+
+    def _evaluate(self, cfunc, x, y, points_key):
+        if self._path is None or not cfunc.persist:
+            return cfunc.evaluate(x, y)
+
+        path = self._disk_path(cfunc, points_key)
+        if path.exists():
+            try:
+                out = np.load(path, mmap_mode="r")
+                # Mark as recently used
+                os.utime(path)
+                return out
+            except (ValueError, OSError):
+                logger.warning(f"Invalid cfunc cache file, recomputing: {path}")
+
+        out = cfunc.evaluate(x, y)
+
+        self._path.mkdir(parents=True, exist_ok=True)
+        utils.os.write_atomic(path, lambda f: np.save(f, out))
+        self.prune(keep=path)
 
         return out
 
+    def _files(self):
+        """Saved results, with their stats, least recently used first"""
+        files = []
+        for path in self._path.glob("*.npy"):
+            try:
+                files.append((path.stat(), path))
+            except OSError:
+                # Removed by a concurrent build
+                continue
+
+        return sorted(files, key=lambda f: f[0].st_mtime_ns)
+
+    def prune(self, keep=None):
+        """Remove the least recently used saved results until they fit in max_bytes, never removing `keep`"""
+        if self._path is None or not self._path.exists():
+            return
+
+        files = self._files()
+        total = sum(stat.st_size for stat, _ in files)
+        for stat, path in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+
+    def clear(self):
+        """Remove all memoized and saved results"""
+        self._results.clear()
+        if self._path is not None and self._path.exists():
+            for _, path in self._files():
+                path.unlink(missing_ok=True)
+
+    def get(self, cfunc, x, y):
+        points_key = _points_key(x, y)
+        key = (cfunc.key, points_key)
+
+        if key not in self._results:
+            out = self._evaluate(cfunc, x, y, points_key)
+            out.flags.writeable = False
+            self._results[key] = out
+
+        return self._results[key]
+
+
+class ColorFunction:
+    """
+    Base color function. Maps arrays of (x, y) points to float32 values
+
+    Subclasses implement `evaluate`. Calling the function evaluates it, or fetches the result from its
+    cache if one is given. Subclasses set `persist` if their results are expensive enough to save to disk.
+    """
+
+    persist = False
 
-class RandomUniformCFunc:
-    def __init__(self, config):
+    def __init__(self, config, cache=None):
         self._config = config
-        self._rnd_state = np.random.RandomState(self._config.seed)
+        self._cache = cache
+        self.key = config.model_dump_json()
+
+    def evaluate(self, x, y):
+        raise NotImplementedError()
 
     def __call__(self, x, y):
-        out = self._rnd_state.uniform(size=x.shape)
+        x = np.asarray(x)
+        y = np.asarray(y)
+
+        if self._cache is None:
+            return self.evaluate(x, y)
+        return self._cache.get(self, x, y)
+
+
+class GradientCFunc(ColorFunction):
+    def __init__(self, config, cache=None):
+        super().__init__(config, cache)
+        self._direction = np.array(self._config.direction).reshape(2, 1)
+        self._direction = self._direction / np.linalg.norm(self._direction)
+
+    def evaluate(self, x, y):
+        points = np.array([x, y]).T
+
+        out = (points @ self._direction).reshape(x.shape).astype(np.float32)
+
+        return _standardize(out, self._config.range)
+
+
+class RandomUniformCFunc(ColorFunction):
+    def evaluate(self, x, y):
+        # Hash based, so each value depends only on the seed and its own coordinate
+        out = utils.noise.hash_uniform(self._config.seed, x, y).astype(np.float32)
 
-        out = (out - self._config.range[0]) * (self._config.range[1] - self._config.range[0])
+        out -= self._config.range[0]
+        out *= self._config.range[1] - self._config.range[0]
 
         return out
 
 
-class SimplexNoiseCFunc:
-    def __init__(self, config):
-        self._config = config
+class SimplexNoiseCFunc(ColorFunction):
+    persist = True
 
-    def __call__(self, x, y):
-        simplex.seed(self._config.seed)
+    def __init__(self, config, cache=None):
+        super().__init__(config, cache)
+        self._noise = utils.noise.SimplexNoise(self._config.seed)
 
+    def evaluate(self, x, y):
         if self._config.angle != 0:
             # Multiply by -1 so we rotate in correct direction (stupid PIL with y going down)
             theta = -1 * self._config.angle / 180 * np.pi
@@ -68,28 +205,28 @@ class SimplexNoiseCFunc:
         x = x / self._config.length_scale[0]
         y = y / self._config.length_scale[1]
 
-        out = np.vectorize(simplex.noise2)(x, y)
+        out = self._noise.noise2(x, y).astype(np.float32)
 
         out = _standardize(out, self._config.range)
 
         return out
 
 
-class ComposedCFunc:
-    def __init__(self, config):
-        self._config = config
-        self._color_funcs = [colorfunc_from_config(c) for c in config.color_functions]
-
-    def __call__(self, x, y):
-        results = [cfunc(x, y) for cfunc in self._color_funcs]
+class ComposedCFunc(ColorFunction):
+    def __init__(self, config, cache=None):
+        super().__init__(config, cache)
+        self._color_funcs = [colorfunc_from_config(c, cache=cache) for c in config.color_functions]
 
-        result = functools.reduce(lambda x, y: x + y, results)
+    def evaluate(self, x, y):
+        # Accumulate children into a single float32 buffer, then standardize it in place
+        out = np.array(self._color_funcs[0](x, y), dtype=np.float32)
+        for cfunc in self._color_funcs[1:]:
+            out += cfunc(x, y)
 
-        result = _standardize(result, self._config.range)
-        return result
+        return _standardize(out, self._config.range)
 
 
-def colorfunc_from_config(config) -> ColorFunction:
+def colorfunc_from_config(config, cache=None) -> ColorFunction:
     if config is None:
         return None
 
@@ -104,4 +241,4 @@ def colorfunc_from_config(config) -> ColorFunction:
     if cfunc is None:
         raise ValueError(f"Unknown cfunc: {config.type}")
 
-    return cfunc(config)
+    return cfunc(config, cache=cache)
@@ -1,25 +1,101 @@
 #!/usr/bin/env python3
 
-import matplotlib as mpl
+import functools
+
+import numpy as np
 
 from ilivery import utils
 
 
+def _lookup_table(n, x, y):
+    """
+    Sample a piecewise-linear color channel at n evenly spaced levels (as matplotlib's colormap lookup tables)
+
+    Parameters
+    ----------
+    n : int
+        Number of levels
+    x : np.ndarray
+        Anchor positions, increasing from 0 to 1. Repeated positions give sharp transitions
+    y : np.ndarray
+        Channel value at each anchor
+
+    Returns
+    -------
+    lut : np.ndarray
+        Channel value at each level, shape (n,)
+    """
+    x = x * (n - 1)
+    levels = (n - 1) * np.linspace(0, 1, n)
+    ind = np.searchsorted(x, levels)[1:-1]
+
+    distance = (levels[1:-1] - x[ind - 1]) / (x[ind] - x[ind - 1])
+    lut = np.concatenate([[y[0]], distance * (y[ind] - y[ind - 1]) + y[ind - 1], [y[-1]]])
+
+    return np.clip(lut, 0.0, 1.0)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(colors, anchors, n_levels):
+    """
+    Compile a colormap to float and uint8 lookup tables, shape (n_levels, 4). Cached, so colormaps
+    built from the same config share their tables
+    """
+    colors = np.array(colors, dtype=float)
+    if colors.shape[1] == 3:
+        colors = np.concatenate([colors, np.ones((len(colors), 1))], axis=1)
+    anchors = np.array(anchors, dtype=float)
+
+    lut = np.stack([_lookup_table(n_levels, anchors, colors[:, c]) for c in range(4)], axis=1)
+    lut_uint8 = np.round(lut * 255).astype(np.uint8)
+
+    lut.flags.writeable = False
+    lut_uint8.flags.writeable = False
+
+    return lut, lut_uint8
+
+
 class LinearSegmentedColormap:
+    """
+    Linearly segmented colormap, compiled to a lookup table with one entry per color level
+
+    Values are mapped to levels as matplotlib colormaps do. Values outside [0, 1] take the first or
+    last level, and NaN values map to transparent black.
+    """
+
     def __init__(self, config):
         self._config = config
 
-        colors = [utils.color.standardize_colors(c) for c in config.colors]
+        colors = tuple(tuple(float(v) for v in utils.color.standardize_colors(c)) for c in config.colors)
+        if config.segments:
+            anchors = (0.0, *config.segments, 1.0)
+        else:
+            anchors = tuple(np.linspace(0, 1, len(colors)))
+
+        self._lut, self.lut = _compile(colors, anchors, config.n_levels)
+
+    @property
+    def n_levels(self):
+        return len(self.lut)
+
+    def index(self, value):
+        """Lookup table index of each value, with -1 for NaN values"""
+        value = np.asarray(value, dtype=float)
 
-        if self._config.segments:
-            segments = [0] + self._config.segments + [1]
+        with np.errstate(invalid="ignore"):
+            index = np.clip(np.floor(value * self.n_levels), 0, self.n_levels - 1)
 
-            colors = [(a, b) for a, b in zip(segments, colors)]
+        return np.where(np.isnan(value), -1, index).astype(int)
 
-        self._cmap = mpl.colors.LinearSegmentedColormap.from_list("", colors, N=config.n_levels)
+    def lookup(self, value):
+        """Map values to uint8 RGBA colors, shape (*value.shape, 4)"""
+        index = self.index(value)
+        return np.where((index >= 0)[..., None], self.lut[index], 0).astype(np.uint8)
 
     def __call__(self, value):
-        return self._cmap(value)
+        """Map values to float RGBA colors, shape (*value.shape, 4)"""
+        index = self.index(value)
+        return np.where((index >= 0)[..., None], self._lut[index], 0.0)
 
 
 def colormap_from_config(config):
@@ -153,7 +153,8 @@ class RandomUniformCFunc(BaseModel):
     """
     Random uniform color function
 
-    Returns a value drawn from the random uniform distribution, scaled to the given range
+    Returns a value drawn from the random uniform distribution, scaled to the given range. Values are
+    a hash of the seed and the sample coordinate, so the same point always gets the same value
 
     seed: Random seed
     range: Return value range, defaults to [0,1]
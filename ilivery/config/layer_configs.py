@@ -19,10 +19,15 @@ from ilivery.config.color_configs import Color, Spec, ColorMap, ColorFunction
 class TextureLayer(BaseModel):
     """
     Named texture layer. Applies the given texture everywhere in the layer
+
+    texture: Texture name: a texture folder in resources/textures/ (case insensitive), or CARBON_FIBER
+    tiling: How the texture is tiled when it is smaller than the livery. REPEAT for periodic textures,
+        MIRROR for any other texture
     """
 
     type: Literal["TEXTURE"]
-    texture: Literal["CARBON_FIBER"]
+    texture: str
+    tiling: Literal["REPEAT", "MIRROR"] = "REPEAT"
     section: Optional[str] = None
 
 
@@ -36,6 +41,33 @@ class SolidLayer(BaseModel):
     spec: Optional[Spec] = None
 
 
+class GradientLayer(BaseModel):
+    """
+    Gradient layer. Fades through a colormap across the entire layer
+
+    gradient: LINEAR fades along `angle`, RADIAL fades outwards from `center`
+    cmap: Gradient colormap
+    angle: Linear gradient direction, counterclockwise in degrees
+    center: Radial gradient center, in pixels from the top left corner. Defaults to the top left corner
+    spec: Layer spec, mutually exclusive with spec_cmap
+    spec_cmap: Spec colormap, faded along the same gradient as the paint
+    """
+
+    type: Literal["GRADIENT"]
+    gradient: Literal["LINEAR", "RADIAL"] = "LINEAR"
+    cmap: ColorMap
+    angle: float = 0
+    center: Optional[pydantic.conlist(float, min_length=2, max_length=2)] = None
+    spec: Optional[Spec] = None
+    spec_cmap: Optional[ColorMap] = None
+
+    @pydantic.model_validator(mode="after")
+    def check_spec(self) -> "GradientLayer":
+        if self.spec is not None and self.spec_cmap is not None:
+            raise ValueError("Only one of spec and spec_cmap may be given")
+        return self
+
+
 class LogoDecal(BaseModel):
     """
     Logan Grado's custom logo decal
@@ -153,27 +185,25 @@ class PatchLayer(BaseModel):
 class PatternLayer(BaseModel):
     """Pattern layer"""
 
-    class TrianglePattern(BaseModel):
+    class _LatticePattern(BaseModel):
         """
-        Triangle pattern
+        Options shared by all lattice patterns
 
-        triangle_size: Triangle size
         angle: Pattern angle
-        facecolor: Triangle face color, mutually exclusive with face_cmap
-        face_cmap: Triangle face colormap
-        face_cfunc: Triangle face color function
-        edgecolor: Triangle edge color
-        facespec: Triangle facespec
-        facespec: Triangle facespec, mutually exclusive with facespec_cmap
-        facespec_cmap: Triangle facespec colormap
-        facespec_cfunc: Triangle facespec function
-        edgespec: Triangle edge spec
-        edgewidth: Triangle edgewidth
-        spacing: Spacing between triangles
+        facecolor: Cell face color, mutually exclusive with face_cmap
+        face_cmap: Cell face colormap
+        face_cfunc: Cell face color function
+        edgecolor: Cell edge color
+        facespec: Cell facespec, mutually exclusive with facespec_cmap
+        facespec_cmap: Cell facespec colormap
+        facespec_cfunc: Cell facespec function
+        edgespec: Cell edge spec
+        edgewidth: Cell edge width, in points. Defaults to matplotlib's default patch line width
+        spacing: Spacing between cells
+        rasterizer: AGG draws every cell with matplotlib. STAMP composites pre-rendered cell stamps,
+            which is much faster for patterns with many cells
         """
 
-        type: Literal["TRIANGLES"]
-        triangle_size: int
         angle: float = 0
         facecolor: Optional[Color] = None
         face_cmap: Optional[ColorMap] = None
@@ -183,11 +213,64 @@ class PatternLayer(BaseModel):
         facespec_cmap: Optional[ColorMap] = None
         facespec_cfunc: Optional[ColorFunction] = None
         edgespec: Optional[Spec] = None
-        edgewidth: int = 0
+        edgewidth: Optional[float] = None
         spacing: int = 0
+        rasterizer: Literal["AGG", "STAMP"] = "AGG"
+
+    class TrianglePattern(_LatticePattern):
+        """
+        Triangle pattern
+
+        triangle_size: Triangle size
+        """
+
+        type: Literal["TRIANGLES"]
+        triangle_size: int
+
+    class HexagonPattern(_LatticePattern):
+        """
+        Hexagon pattern
+
+        hexagon_size: Hexagon size (vertex to vertex)
+        """
+
+        type: Literal["HEXAGONS"]
+        hexagon_size: int
+
+    class SquarePattern(_LatticePattern):
+        """
+        Square pattern
+
+        square_size: Square size
+        """
+
+        type: Literal["SQUARES"]
+        square_size: int
+
+    class CustomLatticePattern(_LatticePattern):
+        """
+        Pattern of an arbitrary polygon, repeated on a lattice
+
+        cell_size: Cell size. Verticies and basis vectors are scaled by cell_size
+        vertices: Cell polygon verticies, centered at (0, 0)
+        basis: The two lattice basis vectors
+        """
+
+        type: Literal["LATTICE"]
+        cell_size: int
+        vertices: pydantic.conlist(pydantic.conlist(float, min_length=2, max_length=2), min_length=3)
+        basis: pydantic.conlist(pydantic.conlist(float, min_length=2, max_length=2), min_length=2, max_length=2)
 
     type: Literal["PATTERN"]
-    pattern: TrianglePattern
+    pattern: Annotated[
+        Union[
+            TrianglePattern,
+            HexagonPattern,
+            SquarePattern,
+            CustomLatticePattern,
+        ],
+        pydantic.Discriminator("type"),
+    ]
 
 
 ## ==================================
@@ -196,6 +279,7 @@ LayerConfig = Annotated[
     Union[
         PatternLayer,
         SolidLayer,
+        GradientLayer,
         DecalLayer,
         TextureLayer,
         ClassDecalLayer,
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import json
+from pathlib import Path
 from typing import List, Optional
 
 from ilivery.config.base_model import BaseModel
@@ -48,3 +50,37 @@ class LiveryConfig(BaseModel):
     sections: List[SectionConfig]
     final_mask: Optional[str] = None
     iracing_output: Optional[iRacingConfig] = None
+
+
+def load_config(config_path, imports=None):
+    """
+    Load and validate a livery config
+
+    Parameters
+    ----------
+    config_path : Path
+        Config file. Only jsonnet configs are supported
+    imports : set
+        If given, the paths of every file imported by the config are added to it
+
+    Returns
+    -------
+    config : LiveryConfig
+    """
+    config_path = Path(config_path)
+
+    if config_path.suffix == ".jsonnet":
+        import _jsonnet
+
+        def _import(directory, rel):
+            path = Path(directory) / rel
+            content = path.read_bytes()
+            if imports is not None:
+                imports.add(path.resolve())
+            return str(path), content
+
+        config = json.loads(_jsonnet.evaluate_file(str(config_path), import_callback=_import))
+    else:
+        raise ValueError(f"Unknown suffix: {config_path.suffix}")
+
+    return LiveryConfig.model_validate(config)
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import threading
+
+import numpy as np
+from PIL import Image
+
+from ilivery import DECAL_DIR, DECAL_ATLAS_DIR, utils
+from ilivery.layer import Layer
+
+logger = logging.getLogger(__name__)
+
+# Default budget of the decoded decal cache
+DECAL_CACHE_BYTES = 256 * 2**20
+
+# Decoded, resized and recolored decals, shared by every build in the process. Set `cache.max_bytes` to
+# change the budget
+cache = utils.cache.LRUCache(DECAL_CACHE_BYTES)
+
+
+class DecalAtlas:
+    """
+    Memory mapped atlas of the decal library
+
+    Every decal is stored premultiplied, cropped to the bounds of its nonzero alpha, in a single pixel
+    array. An index maps decal names (paths relative to the decal directory, without suffix) to their
+    pixels, crop bounds, full size and source file hash.
+
+    Decals are premultiplied as PIL does before resampling, and padded back to their full size when
+    loaded, so resizing a decal from the atlas gives exactly the same result as resizing its PNG.
+
+    Parameters
+    ----------
+    path : Path
+        Atlas directory, as written by pack
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path / "index.json") as f:
+            self._index = json.load(f)
+        self._pixels = np.load(path / "pixels.npy", mmap_mode="r")
+
+    @classmethod
+    def load(cls, path):
+        """Load the atlas at path, or return None if there is no valid atlas"""
+        try:
+            return cls(path)
+        except (OSError, ValueError):
+            return None
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def names(self):
+        return sorted(self._index)
+
+    def is_fresh(self, name, path):
+        """Whether the atlas entry for name matches its source file"""
+        entry = self._index.get(name)
+        if entry is None:
+            # Missing files have nothing to pack
+            return not path.exists()
+        if not path.exists():
+            return False
+
+        # Only hash files whose modification time or size has changed
+        stat = path.stat()
+        if stat.st_mtime_ns == entry["mtime_ns"] and stat.st_size == entry["st_size"]:
+            return True
+        return utils.cache.file_hash(path) == entry["sha256"]
+
+    def image(self, name):
+        """Full size premultiplied (RGBa) image of a decal. PIL resizes these directly, as it does RGBA images"""
+        entry = self._index[name]
+        size = tuple(entry["size"])
+        left, upper, right, lower = entry["bbox"]
+
+        canvas = Image.new("RGBa", size)
+        if right > left and lower > upper:
+            offset = entry["offset"]
+            pixels = self._pixels[offset : offset + (right - left) * (lower - upper)]
+            crop = Image.frombuffer(
+                "RGBa", (right - left, lower - upper), np.ascontiguousarray(pixels), "raw", "RGBa", 0, 1
+            )
+            canvas.paste(crop, (left, upper))
+
+        return canvas
+
+
+def pack(decal_dir=None, atlas_dir=None):
+    """
+    Pack every PNG in the decal directory (recursively) into a decal atlas
+
+    Parameters
+    ----------
+    decal_dir : Path
+        Decal directory. Defaults to DECAL_DIR
+    atlas_dir : Path
+        Atlas directory. Defaults to DECAL_ATLAS_DIR
+
+    Returns
+    -------
+    atlas : DecalAtlas
+    """
+    decal_dir = DECAL_DIR if decal_dir is None else decal_dir
+    atlas_dir = DECAL_ATLAS_DIR if atlas_dir is None else atlas_dir
+
+    index = {}
+    pixels = []
+    offset = 0
+    for path in sorted(decal_dir.rglob("*.png")):
+        name = path.relative_to(decal_dir).with_suffix("").as_posix()
+        stat = path.stat()
+
+        decal = Image.open(path).convert("RGBA")
+        bbox = decal.getchannel("A").getbbox() or (0, 0, 0, 0)
+        data = np.asarray(decal.convert("RGBa").crop(bbox)).reshape(-1, 4)
+
+        index[name] = {
+            "offset": offset,
+            "bbox": list(bbox),
+            "size": list(decal.size),
+            "sha256": utils.cache.file_hash(path),
+            "mtime_ns": stat.st_mtime_ns,
+            "st_size": stat.st_size,
+        }
+        pixels.append(data)
+        offset += len(data)
+
+    pixels = np.concatenate(pixels) if pixels else np.zeros((0, 4), dtype=np.uint8)
+
+    # The index is written last, so it never refers to pixels that are not written yet
+    atlas_dir.mkdir(parents=True, exist_ok=True)
+    utils.os.write_atomic(atlas_dir / "pixels.npy", lambda f: np.save(f, pixels))
+    utils.os.write_atomic(atlas_dir / "index.json", lambda f: f.write(json.dumps(index, indent=2).encode()))
+
+    logger.info(f"Packed {len(index)} decals ({pixels.nbytes / 2**20:.1f} MiB) into {atlas_dir}")
+
+    return DecalAtlas(atlas_dir)
+
+
+_atlas = None
+_atlas_lock = threading.Lock()
+
+
+def _decal_image(name):
+    """
+    Full size image of a named decal, premultiplied from the decal atlas if one has been packed, or RGBA
+
+    The atlas is repacked automatically when a decal's source file has changed. Without an atlas, the
+    PNG is decoded directly.
+    """
+    global _atlas
+    path = DECAL_DIR / f"{name}.png"
+
+    with _atlas_lock:
+        if _atlas is None or _atlas.path != DECAL_ATLAS_DIR:
+            _atlas = DecalAtlas.load(DECAL_ATLAS_DIR)
+
+        if _atlas is not None and not _atlas.is_fresh(name, path):
+            logger.info(f"Decal {name} has changed, repacking decal atlas")
+            _atlas = pack(DECAL_DIR, DECAL_ATLAS_DIR)
+
+        atlas = _atlas
+
+    if atlas is not None and name in atlas:
+        return atlas.image(name)
+
+    return Image.open(path).convert("RGBA")
+
+
+class MipPyramid:
+    """
+    Area averaged mip levels of a decal
+
+    Each level halves the previous one, averaging 2x2 blocks of premultiplied pixels. Resizing starts from
+    the smallest level that is still at least the target size, so large decals placed small are resampled
+    from a few pixels instead of the full resolution source.
+
+    The full resolution source is not kept, since the largest placements are rare. It is loaded again when
+    a placement needs it.
+
+    Parameters
+    ----------
+    base : PIL.Image
+        Full resolution decal, RGBA or premultiplied RGBa
+    """
+
+    def __init__(self, base):
+        self.size = base.size
+
+        level = base.convert("RGBa") if base.mode == "RGBA" else base
+        self.levels = []
+        while min(level.size) >= 2:
+            level = level.reduce(2)
+            data = np.array(level)
+            data.flags.writeable = False
+            self.levels.append(data)
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self.levels)
+
+    def level_for(self, size):
+        """Index of the smallest level at least as large as size, where 0 is the full resolution source"""
+        k = 0
+        while k < len(self.levels) and all(s / 2 ** (k + 1) >= t for s, t in zip(self.size, size)):
+            k += 1
+        return k
+
+    def resize(self, size, load_base):
+        """
+        Resize the decal
+
+        Parameters
+        ----------
+        size : tuple[int]
+            Target size
+        load_base : callable
+            Returns the full resolution source, if it is needed
+
+        Returns
+        -------
+        img : PIL.Image
+            Resized decal, RGBa or RGBA
+        """
+        k = self.level_for(size)
+        if k == 0:
+            return load_base().resize(size)
+
+        # Levels round odd sizes up, so only sample the part of the level covering the source
+        level = Image.fromarray(self.levels[k - 1], mode="RGBa")
+        box = (0, 0, self.size[0] / 2**k, self.size[1] / 2**k)
+        return level.resize(size, box=box)
+
+
+def _pyramid(name, path):
+    return cache.get_or_create(("pyramid", utils.cache.file_hash(path)), lambda: MipPyramid(_decal_image(name)))
+
+
+def _target_size(source_size, decal_size):
+    if decal_size[0] is None:
+        return (int(source_size[0] / source_size[1] * decal_size[1]), decal_size[1])
+    elif decal_size[1] is None:
+        return (decal_size[0], int(source_size[1] / source_size[0] * decal_size[0]))
+    else:
+        return tuple(decal_size)
+
+
+# Rotations by right angles are exact transposes, without resampling
+_TRANSPOSES = {
+    90: Image.Transpose.ROTATE_90,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_270,
+}
+
+
+def _to_arrays(layer, spec=True):
+    """Read-only paint and spec arrays of a layer, for caching"""
+    paint = np.array(layer._paint)
+    spec = np.array(layer._spec) if spec else None
+    for data in (paint, spec):
+        if data is not None:
+            data.flags.writeable = False
+
+    return paint, spec
+
+
+def _from_arrays(paint, spec):
+    # Images share the cached, read-only arrays, and are copied by PIL before being written to
+    layer = Layer.from_image(Image.fromarray(paint))
+    if spec is not None:
+        layer._spec = Image.fromarray(spec)
+
+    return layer
+
+
+def _render_named_decal(name, path, size, color, spec):
+    pyramid = _pyramid(name, path)
+    decal = pyramid.resize(_target_size(pyramid.size, size), lambda: _decal_image(name)).convert("RGBA")
+
+    # Apply color, if any
+    if color is not None:
+        data = np.array(decal)
+        data[:, :, :3] = color
+        decal = Image.fromarray(data)
+
+    return _to_arrays(Layer.from_image(decal, spec), spec=spec is not None)
+
+
+def named_decal_key(name, size, color=None, spec=None):
+    """Cache key of a named decal, from its file content and parameters"""
+    return (
+        utils.cache.file_hash(DECAL_DIR / f"{name}.png"),
+        tuple(size),
+        None if color is None else tuple(color),
+        None if spec is None else tuple(spec),
+    )
+
+
+def named_decal(name, size, color=None, spec=None):
+    """
+    Load a named decal from DECAL_DIR as a Layer, resized and recolored
+
+    Decals are cached by file content, size, color and spec, so repeated placements of the same decal,
+    including mirrors, decode and resize the file only once per process. Decals are read from the decal
+    atlas, if one has been packed (see pack), and resized from a cached MipPyramid.
+
+    Parameters
+    ----------
+    name : str
+        Decal name, in DECAL_DIR
+    size : tuple[int]
+        Decal size. If either dimension is None, it is set from the other, preserving the aspect ratio
+    color : color
+        Decal color, replacing the decal's own colors. If None, use the decal as is
+    spec : color
+        Decal spec, applied with the decal's alpha
+
+    Returns
+    -------
+    layer : Layer
+    """
+    path = DECAL_DIR / f"{name}.png"
+    key = named_decal_key(name, size, color, spec)
+
+    return _from_arrays(*cache.get_or_create(key, lambda: _render_named_decal(name, path, size, color, spec)))
+
+
+def rotate_decal(decal, angle, key=None, resample=Image.Resampling.BICUBIC):
+    """
+    Rotate a decal counterclockwise, expanding it to fit
+
+    Right angle rotations are exact transposes. Other rotations are resampled, and memoized by (key, angle,
+    resample) when the decal has a cache key, so a decal placed several times at the same angle is only
+    resampled once.
+
+    Parameters
+    ----------
+    decal : Layer
+        Decal to rotate
+    angle : float
+        Rotation, in degrees
+    key : tuple
+        Cache key of the decal, eg. from named_decal_key. If None, the rotation is not memoized
+    resample : PIL.Image.Resampling
+        Resampling filter
+
+    Returns
+    -------
+    layer : Layer
+    """
+    angle = angle % 360
+
+    if angle == 0:
+        return decal
+    if angle in _TRANSPOSES:
+        return decal.transpose(_TRANSPOSES[angle])
+
+    def _rotate():
+        return decal.rotate(angle, expand=True, resample=resample)
+
+    if key is None:
+        return _rotate()
+
+    return _from_arrays(*cache.get_or_create((key, "rotate", angle, resample), lambda: _to_arrays(_rotate())))
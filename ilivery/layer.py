@@ -98,6 +98,13 @@ class Layer:
         new_layer._spec = new_layer._spec.rotate(angle, **kwargs)
         return new_layer
 
+    def transpose(self, method) -> "Layer":
+        """Flip or rotate the layer by a multiple of 90 degrees, exactly. See PIL.Image.transpose"""
+        new_layer = Layer((1, 1))
+        new_layer._paint = self._paint.transpose(method)
+        new_layer._spec = self._spec.transpose(method)
+        return new_layer
+
     def set_color(self, color) -> "Layer":
         new_layer = self.copy()
 
@@ -127,13 +134,33 @@ class Layer:
 
         return new_layer
 
-    def flatten(self, other_layer, dest=(0, 0)) -> "Layer":
-        new_layer = self.copy()
+    def composite(self, other_layer, dest=(0, 0)) -> "Layer":
+        """
+        Composite another layer over this one at dest, in place, clipped to this layer's bounds
 
-        new_layer._paint.alpha_composite(other_layer._paint, dest=dest)
-        new_layer._spec.alpha_composite(other_layer._spec, dest=dest)
+        Sprite layers are composited sprite by sprite, without building their full-size images.
+        """
+        if isinstance(other_layer, SpriteLayer):
+            for sprite, sprite_dest in other_layer.sprites:
+                self.composite(sprite, dest=(dest[0] + sprite_dest[0], dest[1] + sprite_dest[1]))
+            return self
 
-        return new_layer
+        left, top = (int(d) for d in dest)
+        width, height = other_layer.size
+
+        x0, y0 = max(left, 0), max(top, 0)
+        x1, y1 = min(left + width, self.size[0]), min(top + height, self.size[1])
+        if x0 >= x1 or y0 >= y1:
+            return self
+
+        source = (x0 - left, y0 - top, x1 - left, y1 - top)
+        self._paint.alpha_composite(other_layer._paint, dest=(x0, y0), source=source)
+        self._spec.alpha_composite(other_layer._spec, dest=(x0, y0), source=source)
+
+        return self
+
+    def flatten(self, other_layer, dest=(0, 0)) -> "Layer":
+        return self.copy().composite(other_layer, dest=dest)
 
     def show(self):
         self._paint.show()
@@ -166,3 +193,53 @@ class Layer:
 
         self._paint = paint_out
         return self
+
+
+class SpriteLayer(Layer):
+    """
+    Layer made of small sprite layers, each placed at a destination offset
+
+    Compositing a sprite layer onto another layer blits each sprite directly, clipped to the destination,
+    so no full-size images are allocated. The full-size images are only built, once, if they are accessed.
+
+    Parameters
+    ----------
+    size : tuple[int]
+        Layer size
+    """
+
+    def __init__(self, size):
+        self._size = tuple(size)
+        self.sprites = []
+        self._layer = None
+
+    @property
+    def size(self):
+        return self._size
+
+    def add(self, sprite: Layer, dest=(0, 0)) -> "SpriteLayer":
+        """Add a sprite, with its upper left corner at dest"""
+        self.sprites.append((sprite, tuple(int(d) for d in dest)))
+        self._layer = None
+        return self
+
+    def _full_size(self) -> Layer:
+        if self._layer is None:
+            self._layer = Layer(self._size).composite(self)
+        return self._layer
+
+    @property
+    def _paint(self):
+        return self._full_size()._paint
+
+    @_paint.setter
+    def _paint(self, image):
+        self._full_size()._paint = image
+
+    @property
+    def _spec(self):
+        return self._full_size()._spec
+
+    @_spec.setter
+    def _spec(self, image):
+        self._full_size()._spec = image
@@ -3,6 +3,7 @@
 import inspect
 
 from .solid_layer import solid_layer
+from .gradient_layer import gradient_layer
 from .decal_layer import decal_layer
 from .texture_layer import texture_layer
 from .class_decal_layer import class_decal_layer
@@ -13,6 +14,7 @@ from ilivery.layer import Layer
 
 _layer_dict = {
     "SOLID": solid_layer,
+    "GRADIENT": gradient_layer,
     "DECAL": decal_layer,
     "TEXTURE": texture_layer,
     "CLASS_DECAL": class_decal_layer,
@@ -32,13 +34,14 @@ def layer_from_config(config, **kwargs) -> Layer:
     sig = inspect.signature(layer_func)
 
     requested_args = [param.name for param in sig.parameters.values()]
+    required_args = [param.name for param in sig.parameters.values() if param.default is inspect.Parameter.empty]
 
     kwargs["config"] = config
-    missing_args = set(requested_args) - set(kwargs.keys())
+    missing_args = set(required_args) - set(kwargs.keys())
     if missing_args:
         raise ValueError(f"Layer {config.type} requesting unknown args: {missing_args}")
 
-    kwargs = {k: kwargs[k] for k in requested_args}
+    kwargs = {k: kwargs[k] for k in requested_args if k in kwargs}
 
     # Call the function with the matched arguments
     return layer_func(**kwargs)
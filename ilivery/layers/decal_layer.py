@@ -3,11 +3,10 @@
 import logging
 
 import numpy as np
-from PIL import Image
 
-from ilivery.layer import Layer
-from ilivery import DECAL_DIR
-from ilivery.patterns.logo import logo
+from ilivery.layer import Layer, SpriteLayer
+from ilivery.decals import named_decal, named_decal_key, rotate_decal
+from ilivery.patterns.logo import logo_coverage, colorize_logo
 
 
 def _center_decal_pos(decal, pos, section_bbox):
@@ -46,56 +45,18 @@ def _mirror_decal(pos, original_rotate, mirror_config):  # axis, offset=0, rotat
     return pos, new_rotate
 
 
-def _add_decal_helper(layer, decal, rotate, pos, section_bbox) -> Layer:
-    if rotate != 0:
-        rotate_kwargs = {"expand": True, "resample": Image.Resampling.BICUBIC}
-        decal = decal.rotate(rotate, **rotate_kwargs)
-
-    layer = layer.flatten(decal, dest=_center_decal_pos(decal, pos, section_bbox))
-
-    return layer
+def _add_decal_helper(layer, decal, pos, section_bbox) -> SpriteLayer:
+    return layer.add(decal, dest=_center_decal_pos(decal, pos, section_bbox))
 
 
 def decal_from_decal_config(config):
     if config.type == "NAMED":
-        decal_path = DECAL_DIR / f"{config.name}.png"
-        decal = Image.open(decal_path).convert("RGBA")
-
-        decal_size = config.size
-        # Resize
-        if decal_size[0] is None:
-            resize = (int(decal.size[0] / decal.size[1] * decal_size[1]), decal_size[1])
-        elif decal_size[1] is None:
-            resize = (decal_size[0], int(decal.size[1] / decal.size[0] * decal_size[0]))
-        else:
-            resize = decal_size
-
-        decal = decal.resize(resize)
-
-        # Apply color, if any
-        if config.color is not None:
-            data = np.array(decal)
-            data[:, :, :3] = config.color
-            decal = Image.fromarray(data)
-
-        # Create a decal Layer
-        decal_layer = Layer.from_image(decal, config.spec)
+        decal_layer = named_decal(config.name, size=config.size, color=config.color, spec=config.spec)
 
     elif config.type == "LOGO":
-        logo_paint = logo(
-            size=config.size,
-            facecolor=config.facecolor,
-            edgecolor=config.edgecolor,
-            edgewidth=config.edgewidth,
-            edgeratio=config.edgeratio,
-        )
-        logo_spec = logo(
-            size=config.size,
-            facecolor=config.facespec,
-            edgecolor=config.edgespec,
-            edgewidth=config.edgewidth,
-            edgeratio=config.edgeratio,
-        )
+        coverage = logo_coverage(size=config.size, edgewidth=config.edgewidth, edgeratio=config.edgeratio)
+        logo_paint = colorize_logo(coverage, facecolor=config.facecolor, edgecolor=config.edgecolor)
+        logo_spec = colorize_logo(coverage, facecolor=config.facespec, edgecolor=config.edgespec)
 
         decal_layer = Layer.from_image(logo_paint, logo_spec)
 
@@ -105,8 +66,16 @@ def decal_from_decal_config(config):
     return decal_layer
 
 
-def decal_layer(config, size: tuple[int]) -> Layer:
-    layer = Layer(size)
+def _decal_key(config):
+    """Cache key of a decal config's raster, or None if it is not cached"""
+    if config.type == "NAMED":
+        return named_decal_key(config.name, size=config.size, color=config.color, spec=config.spec)
+    return None
+
+
+def decal_layer(config, size: tuple[int]) -> SpriteLayer:
+    # Decals are returned as positioned sprites, and blitted straight into the section
+    layer = SpriteLayer(size)
 
     decal = decal_from_decal_config(config.decal)
 
@@ -115,22 +84,17 @@ def decal_layer(config, size: tuple[int]) -> Layer:
     # Reflect position across x axis - PIL things positive y is down.
     pos = np.array(config.pos) * [1, -1]
 
-    layer = _add_decal_helper(
-        layer=layer,
-        decal=decal,
-        rotate=config.rotate,
-        pos=pos,
-        section_bbox=section_bbox,
-    )
+    key = _decal_key(config.decal)
+    rotated = rotate_decal(decal, config.rotate, key=key)
+    layer = _add_decal_helper(layer=layer, decal=rotated, pos=pos, section_bbox=section_bbox)
+
     if config.mirror:
         mirror_pos, mirror_rotate = _mirror_decal(pos=pos, original_rotate=config.rotate, mirror_config=config.mirror)
 
-        layer = _add_decal_helper(
-            layer=layer,
-            decal=decal,
-            rotate=mirror_rotate,
-            pos=mirror_pos,
-            section_bbox=section_bbox,
-        )
+        # The mirrored decal is the same raster at a new position, so only resample it again if its rotation differs
+        if (mirror_rotate - config.rotate) % 360 != 0:
+            rotated = rotate_decal(decal, mirror_rotate, key=key)
+
+        layer = _add_decal_helper(layer=layer, decal=rotated, pos=mirror_pos, section_bbox=section_bbox)
 
     return layer
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+
+from ilivery.layer import Layer
+from ilivery.colormaps import colormap_from_config
+from ilivery.patterns.gradient import linear_gradient_data, radial_gradient_data, colorize
+
+
+def gradient_layer(config, size: tuple[int]) -> Layer:
+    if config.gradient == "LINEAR":
+        data = linear_gradient_data(size, angle=config.angle)
+    elif config.gradient == "RADIAL":
+        data = radial_gradient_data(size, xy=config.center)
+    else:
+        raise ValueError(f"Unknown gradient: {config.gradient}")
+
+    paint = colorize(data, colormap_from_config(config.cmap))
+
+    spec = config.spec
+    if config.spec_cmap is not None:
+        spec = colorize(data, colormap_from_config(config.spec_cmap))
+
+    return Layer.from_image(paint, spec)
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 
 import numpy as np
+from PIL import Image
 
 from ilivery.layer import Layer
-from ilivery.patches import poly_patch
+from ilivery.patches import poly_patch_coverage, colorize_patch, patch_in_bounds
 from ilivery import utils
 
 
@@ -23,23 +24,21 @@ def _mirror_verts(verts, radii, config):
     return verts, radii
 
 
+def _center(size):
+    return tuple([round(c / 2) for c in size])
+
+
 def _build_patch(size, vertices, radii, facecolor, edgecolor, facespec, edgespec, edgewidth):
     # Add center to vertices
-    center = tuple([round(c / 2) for c in size])
+    vertices = np.array(vertices) + _center(size)
 
-    vertices = np.array(vertices) + center
+    # Rasterize once, and colorize the same coverage for both paint and spec
+    coverage = poly_patch_coverage(vertices, radii, linewidth=edgewidth, size=size)
 
-    kwargs = {
-        "vertices": vertices,
-        "radii": radii,
-        "linewidth": edgewidth,
-        "size": size,
-    }
-
-    decal = poly_patch(facecolor=facecolor, edgecolor=edgecolor, **kwargs)
+    decal = colorize_patch(coverage, size, facecolor=facecolor, edgecolor=edgecolor)
 
     if facespec or edgespec:
-        decal_spec = poly_patch(facecolor=facespec, edgecolor=edgespec, **kwargs)
+        decal_spec = colorize_patch(coverage, size, facecolor=facespec, edgecolor=edgespec)
     else:
         decal_spec = None
 
@@ -48,6 +47,30 @@ def _build_patch(size, vertices, radii, facecolor, edgecolor, facespec, edgespec
     return decal_layer
 
 
+def _mirror_patch_raster(decal, size, vertices, edgewidth, config):
+    """
+    Mirror an already rendered patch by flipping its raster, or return None where that would not be exact
+
+    The flip is exact when the mirror maps pixel centers onto pixel centers (an integer offset), and the
+    rendered patch was not clipped by the image bounds.
+    """
+    if not float(config.offset).is_integer():
+        return None
+    if not patch_in_bounds(np.array(vertices) + _center(size), linewidth=edgewidth, size=size):
+        return None
+
+    center = _center(size)
+    if config.axis == "y":
+        mirrored = decal.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+        dest = (2 * (center[0] + int(config.offset)) - size[0], 0)
+    else:
+        # Image rows run down, the mirror axis is given with y up
+        mirrored = decal.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+        dest = (0, size[1] - 2 * (center[1] + int(config.offset)))
+
+    return mirrored, dest
+
+
 def patch_layer(config, size):
     layer = Layer(size)
 
@@ -73,15 +96,21 @@ def patch_layer(config, size):
     layer = layer.flatten(decal)
 
     if config.mirror_patch:
-        reflect = [-1, 1]
-        offset = [config.mirror_patch.offset, 0]
-        if config.mirror_patch.axis == "x":
-            reflect = reflect[::-1]
-            offset = offset[::-1]
-
-        vertices = (vertices - offset) * reflect + offset
-
-        decal = _build_patch(size, vertices=vertices, radii=radii, **kwargs)
-        layer = layer.flatten(decal)
+        mirrored = _mirror_patch_raster(decal, size, vertices, config.edgewidth, config.mirror_patch)
+
+        if mirrored is not None:
+            decal, dest = mirrored
+            layer = layer.flatten(decal, dest=dest)
+        else:
+            reflect = [-1, 1]
+            offset = [config.mirror_patch.offset, 0]
+            if config.mirror_patch.axis == "x":
+                reflect = reflect[::-1]
+                offset = offset[::-1]
+
+            vertices = (vertices - offset) * reflect + offset
+
+            decal = _build_patch(size, vertices=vertices, radii=radii, **kwargs)
+            layer = layer.flatten(decal)
 
     return layer
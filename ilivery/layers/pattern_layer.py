@@ -1,27 +1,53 @@
 #!/usr/bin/env python3
 
 from ilivery.layer import Layer
-from ilivery.patterns.triangles import triangles
+from ilivery.patterns.lattice import Lattice, lattice_pattern
+from ilivery.patterns.triangles import TRIANGLE_LATTICE
+from ilivery.patterns.hexagons import HEXAGON_LATTICE
+from ilivery.patterns.squares import SQUARE_LATTICE
 
 from ilivery.colormaps import colormap_from_config
-from ilivery.colorfuncs import colorfunc_from_config
+from ilivery.colorfuncs import colorfunc_from_config, CFuncCache
 
 
-def pattern_layer(config, size):
-    image, spec = triangles(
-        triangle_size=config.pattern.triangle_size,
+def _lattice_from_config(config):
+    """Get the lattice and cell size for a pattern config"""
+    if config.type == "TRIANGLES":
+        return TRIANGLE_LATTICE, config.triangle_size
+    elif config.type == "HEXAGONS":
+        return HEXAGON_LATTICE, config.hexagon_size
+    elif config.type == "SQUARES":
+        return SQUARE_LATTICE, config.square_size
+    elif config.type == "LATTICE":
+        return Lattice(prototype=config.vertices, basis=config.basis), config.cell_size
+
+    raise ValueError(f"Unknown pattern: {config.type}")
+
+
+def pattern_layer(config, size, mask=None, cfunc_cache_dir=None):
+    lattice, cell_size = _lattice_from_config(config.pattern)
+
+    # Paint and spec color functions share results for common sub-functions, and expensive fields are
+    # saved to cfunc_cache_dir to be reused by later builds
+    cfunc_cache = CFuncCache(path=cfunc_cache_dir)
+
+    image, spec = lattice_pattern(
+        lattice,
+        cell_size=cell_size,
         size=size,
         angle=config.pattern.angle,
         facecolor=config.pattern.facecolor,
         face_cmap=colormap_from_config(config.pattern.face_cmap),
-        face_cfunc=colorfunc_from_config(config.pattern.face_cfunc),
+        face_cfunc=colorfunc_from_config(config.pattern.face_cfunc, cache=cfunc_cache),
         edgecolor=config.pattern.edgecolor,
         edgewidth=config.pattern.edgewidth,
         facespec=config.pattern.facespec,
         facespec_cmap=colormap_from_config(config.pattern.facespec_cmap),
-        facespec_cfunc=colorfunc_from_config(config.pattern.facespec_cfunc),
+        facespec_cfunc=colorfunc_from_config(config.pattern.facespec_cfunc, cache=cfunc_cache),
         edgespec=config.pattern.edgespec,
         spacing=config.pattern.spacing,
+        mask=mask,
+        rasterizer=config.pattern.rasterizer,
     )
 
     layer = Layer.from_image(image, spec)
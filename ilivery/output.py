@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import hashlib
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ilivery import OUTPUT_MANIFEST_PATH, utils
+
+logger = logging.getLogger(__name__)
+
+_manifest_lock = threading.Lock()
+
+
+def image_hash(image):
+    """Content hash of an image's mode, size and pixels"""
+    sha256 = hashlib.sha256()
+    sha256.update(f"{image.mode} {image.size}".encode())
+    sha256.update(image.tobytes())
+    return sha256.hexdigest()
+
+
+def encode_tga(image):
+    """Encode an image as a run length encoded TGA"""
+    buffer = io.BytesIO()
+    image.save(buffer, format="tga", compression="tga_rle")
+    return buffer.getvalue()
+
+
+def _load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _is_unchanged(entry, path, sha256):
+    """Whether path still holds the output written with the given hash"""
+    if entry is None or entry["sha256"] != sha256:
+        return False
+
+    # The file may have been changed or removed since it was written
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    return stat.st_mtime_ns == entry["mtime_ns"] and stat.st_size == entry["st_size"]
+
+
+def _write(image, path, sha256, entry):
+    if _is_unchanged(entry, path, sha256):
+        logger.info(f"Unchanged, skipping: {path}")
+        return None
+
+    logger.info(f"Saving to path: {path}")
+    data = encode_tga(image)
+    utils.os.write_atomic(path, lambda f: f.write(data))
+
+    stat = path.stat()
+    return {"sha256": sha256, "mtime_ns": stat.st_mtime_ns, "st_size": stat.st_size}
+
+
+def write_tgas(outputs, manifest_path=None):
+    """
+    Write images as TGAs, concurrently and atomically, skipping outputs that have not changed
+
+    Each image is encoded on its own thread, and written to a temporary file that is then renamed over
+    the output, so readers (eg. iRacing) never see a partially written file. The content hash of every
+    written output is kept in a manifest, and outputs whose image and file are unchanged since they were
+    last written are neither encoded nor written again.
+
+    Parameters
+    ----------
+    outputs : dict
+        Images to write, keyed by output path
+    manifest_path : Path
+        Manifest of written outputs. Defaults to OUTPUT_MANIFEST_PATH
+
+    Returns
+    -------
+    written : list[Path]
+        Paths that were written
+    """
+    manifest_path = OUTPUT_MANIFEST_PATH if manifest_path is None else manifest_path
+
+    with _manifest_lock:
+        manifest = _load_manifest(manifest_path)
+
+    paths = list(outputs)
+    with ThreadPoolExecutor(max_workers=max(len(paths), 1)) as executor:
+        hashes = list(executor.map(image_hash, outputs.values()))
+        futures = [
+            executor.submit(_write, outputs[path], path, sha256, manifest.get(str(path.resolve())))
+            for path, sha256 in zip(paths, hashes)
+        ]
+        entries = [future.result() for future in futures]
+
+    written = [path for path, entry in zip(paths, entries) if entry is not None]
+    if written:
+        with _manifest_lock:
+            # Reload, in case another writer has updated the manifest in the meantime
+            manifest = _load_manifest(manifest_path)
+            manifest.update({str(path.resolve()): entry for path, entry in zip(paths, entries) if entry is not None})
+
+            manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            utils.os.write_atomic(manifest_path, lambda f: f.write(json.dumps(manifest, indent=2).encode()))
+
+    return written
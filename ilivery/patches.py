@@ -2,147 +2,79 @@
 
 #!/usr/bin/env python
 
+import matplotlib as mpl
 import numpy as np
-from matplotlib.path import Path
-from matplotlib.patches import PathPatch, Polygon
-from matplotlib.transforms import Bbox, BboxTransformTo
-import matplotlib.pyplot as plt
+from PIL import Image
 
 from ilivery import utils
 
 
-def side(a, b, c):
-    "On which side of line a-b is point c? Returns -1, 0, or 1."
-    return np.sign(np.linalg.det(np.c_[[a, b, c], [1, 1, 1]]))
-
-
-def find_center(seg, radius):
-    "Find center of arc approximating corner at curr."
-    if radius == 0:
-        return seg[1]
-
-    prev, curr, next = seg
-    p0, p1 = prev
-    c0, c1 = curr
-    n0, n1 = next
-    dp = radius * np.hypot(c1 - p1, c0 - p0)
-    dn = radius * np.hypot(c1 - n1, c0 - n0)
-    p = p1 * c0 - p0 * c1
-    n = n1 * c0 - n0 * c1
-    try:
-        results = np.linalg.solve(
-            [[p1 - c1, c0 - p0], [n1 - c1, c0 - n0]],
-            [[p - dp, p - dp, p + dp, p + dp], [n - dn, n + dn, n - dn, n + dn]],
-        )
-    except np.linalg.LinAlgError:
-        raise ValueError(f"Unable to find center, points are likely on a line:\n{np.array(seg)}")
-    side_n = side(prev, curr, next)
-    side_p = side(next, curr, prev)
-    for r in results.T:
-        if (side(prev, curr, r), side(next, curr, r)) == (side_n, side_p):
-            return r
-    raise ValueError("Cannot find solution")
-
-
-def proj(seg, center):
-    "Project center onto lines prev-curr and next-curr."
-    prev, curr, next = seg
-    p0, p1 = prev = np.asarray(prev)
-    c0, c1 = curr = np.asarray(curr)
-    n0, n1 = next = np.asarray(next)
-    pc = curr - prev
-    nc = curr - next
-    pc2 = np.dot(pc, pc)
-    nc2 = np.dot(nc, nc)
-    return (prev + np.dot(center - prev, pc) / pc2 * pc, next + np.dot(center - next, nc) / nc2 * nc)
-
-
-def rad2deg(angle):
-    return angle * 180.0 / np.pi
-
-
-def angle(center, point):
-    x, y = np.asarray(point) - np.asarray(center)
-    return np.arctan2(y, x)
-
-
-def arc_path(center, start, end):
-    "Return a Path for an arc from start to end around center."
-    # matplotlib arcs always go ccw so we may need to mirror
-    mirror = side(center, start, end) < 0
-    if mirror:
-        start *= [1, -1]
-        center *= [1, -1]
-        end *= [1, -1]
-    return Path.arc(rad2deg(angle(center, start)), rad2deg(angle(center, end))), mirror
-
-
-def _points_are_collinear(p1, p2, p3):
+def fillet_corners(vertices, radii):
     """
-    Determine if three 2D points are collinear.
-
-    :param p1: A tuple representing the first point (x1, y1)
-    :param p2: A tuple representing the second point (x2, y2)
-    :param p3: A tuple representing the third point (x3, y3)
-    :return: True if the points are collinear, False otherwise
+    Compute the fillet arc for every corner of a closed polygon, as batched array operations
+
+    Each corner is replaced by a circular arc of the corner's radius, tangent to both of its edges.
+    Duplicate verticies are removed, and collinear corners (which need no fillet) are dropped.
+
+    Parameters
+    ----------
+    vertices : np.ndarray
+        Polygon verticies, shape (n, 2)
+    radii : float or np.ndarray
+        Corner radius, or one radius per vertex. Zero radius corners are drawn with a negligible radius
+
+    Returns
+    -------
+    centers : np.ndarray
+        Arc centers, shape (m, 2)
+    starts : np.ndarray
+        Arc start points, where the arc meets the edge from the previous vertex, shape (m, 2)
+    ends : np.ndarray
+        Arc end points, where the arc meets the edge to the next vertex, shape (m, 2)
+    radii : np.ndarray
+        Arc radii, shape (m,)
+    clockwise : np.ndarray
+        True where the arc runs clockwise from start to end, shape (m,)
     """
-    # Calculate the area of the triangle formed by the three points
-    # Area formula: 0.5 * |x1(y2 - y3) + x2(y3 - y1) + x3(y1 - y2)|
-    area = p1[0] * (p2[1] - p3[1]) + p2[0] * (p3[1] - p1[1]) + p3[0] * (p1[1] - p2[1])
-
-    # If the area is zero, the points are collinear
-    return area == 0
-
-
-def compute_path(vertices, radii):
-    "Return a Path for a closed rounded polygon."
-
-    vertices, radii = _remove_duplicate_points(vertices, radii)
-
-    if np.isscalar(radii):
-        radii = np.repeat(radii, len(vertices))
-    else:
-        radii = np.asarray(radii)
-    path_vertices = []
-    path_codes = []
-    first = True
-    for i in range(len(vertices)):
-        if i == 0:
-            seg = (vertices[-1], vertices[0], vertices[1])
-        elif i == len(vertices) - 1:
-            seg = (vertices[-2], vertices[-1], vertices[0])
-        else:
-            seg = vertices[i - 1 : i + 2]
-
-        radius = radii[i]
-        if radius == 0:
-            radius = 1e-10
-
-        # Determine if the segment is on a line
-        if not _points_are_collinear(*seg):
-            center = find_center(seg, radius)
-            a, b = proj(seg, center)
-            arc, mirror = arc_path(center, a, b)
-            m = [1, 1] if not mirror else [1, -1]
-            bb = Bbox([center, center + (radius, radius)])
-            iter = arc.iter_segments(BboxTransformTo(bb))
-
-            for vertex, code in iter:
-                if code == Path.CURVE4:
-                    path_vertices.extend([m * vertex[0:2], m * vertex[2:4], m * vertex[4:6]])
-                    path_codes.extend([code, code, code])
-                elif code == Path.MOVETO:
-                    path_vertices.append(m * vertex)
-                    if first:
-                        path_codes.append(Path.MOVETO)
-                        first = False
-                    else:
-                        path_codes.append(Path.LINETO)
-
-    path_vertices.append([0, 0])
-    path_codes.append(Path.CLOSEPOLY)
-
-    return Path(path_vertices, path_codes)
+    vertices, radii = _remove_duplicate_points(np.asarray(vertices), radii)
+    vertices = vertices.astype(float)
+
+    prev = np.roll(vertices, 1, axis=0)
+    curr = vertices
+    following = np.roll(vertices, -1, axis=0)
+
+    # Twice the signed area of each (prev, curr, following) triangle. Zero for collinear corners
+    area = (
+        prev[:, 0] * (curr[:, 1] - following[:, 1])
+        + curr[:, 0] * (following[:, 1] - prev[:, 1])
+        + following[:, 0] * (prev[:, 1] - curr[:, 1])
+    )
+    keep = area != 0
+    prev, curr, following = prev[keep], curr[keep], following[keep]
+    radii = np.where(radii[keep] == 0, 1e-10, radii[keep]).astype(float)
+
+    # Unit vectors along both edges, away from the corner
+    to_prev = prev - curr
+    to_prev /= np.hypot(*to_prev.T)[:, None]
+    to_next = following - curr
+    to_next /= np.hypot(*to_next.T)[:, None]
+
+    # Tangent points are r / tan(half angle) along each edge
+    cos_angle = (to_prev * to_next).sum(axis=1)
+    tan_half = np.sqrt((1 - cos_angle) / 2) / np.sqrt((1 + cos_angle) / 2)
+    starts = curr + to_prev * (radii / tan_half)[:, None]
+    ends = curr + to_next * (radii / tan_half)[:, None]
+
+    # The arc center is r from the start point, along the edge normal on the inside of the corner
+    normal = to_prev[:, ::-1] * [-1, 1]
+    normal *= np.sign((normal * to_next).sum(axis=1))[:, None]
+    centers = starts + normal * radii[:, None]
+
+    a = starts - centers
+    b = ends - centers
+    clockwise = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0] < 0
+
+    return centers, starts, ends, radii, clockwise
 
 
 def _compute_intersection(a0, a1, b0, b1):
@@ -243,35 +175,126 @@ def _remove_duplicate_points(vertices, radii):
     return vertices, radii
 
 
-def poly_patch(vertices, radii, facecolor, edgecolor=None, linewidth=None, size=None):
-    if size is None:
-        size = np.ceil(np.array(vertices).max(axis=0) - np.array(vertices).min(axis=0)).astype(int).tolist()
+def _patch_bbox(vertices, edgewidth):
+    """Pixel bounding box (left, upper, right, lower) of a patch and its edge, for image coordinate verticies"""
+    # The rounded outline never leaves the polygon's bounding box
+    pad = edgewidth / 2 + 1
+    x0, y0 = np.floor(vertices.min(axis=0) - pad).astype(int)
+    x1, y1 = np.ceil(vertices.max(axis=0) + pad).astype(int)
+    return x0, y0, x1, y1
 
-    fig, ax = utils.mpl.get_fig(size)
 
+def patch_in_bounds(vertices, linewidth=None, size=None):
+    """
+    Whether a patch, including its edge, lies entirely within the image
+
+    Parameters are as for poly_patch_coverage
+    """
+    vertices = np.array(vertices)
+    if linewidth is None:
+        linewidth = mpl.rcParams["patch.linewidth"]
+
+    x0, y0, x1, y1 = _patch_bbox(vertices * [1, -1] + [0, size[1]], linewidth * utils.raster.POINTS_TO_PX)
+    return x0 >= 0 and y0 >= 0 and x1 <= size[0] and y1 <= size[1]
+
+
+def poly_patch_coverage(vertices, radii, linewidth=None, size=None):
+    """
+    Anti-aliased face and edge coverage of a rounded polygon, from its signed distance field
+
+    Distances are only evaluated inside the patch's bounding box (padded by the edge width), and only
+    near the outline, so the cost scales with the patch area rather than the image size, and mostly with
+    the outline length rather than the area (see utils.raster.rounded_polygon_pixel_distance).
+
+    Parameters
+    ----------
+    vertices : np.ndarray
+        Polygon verticies, shape (n, 2), in pixels with y up
+    radii : float or np.ndarray
+        Corner radius, or one radius per vertex
+    linewidth : float
+        Edge width, in points. Defaults to matplotlib's default patch line width
+    size : tuple[int]
+        Image size
+
+    Returns
+    -------
+    face : np.ndarray
+        Face coverage inside the bounding box, float32 with shape (height, width)
+    edge : np.ndarray
+        Edge coverage inside the bounding box, with the same shape as face
+    box : tuple[int]
+        Bounding box (left, upper, right, lower) in image pixels, clipped to the image
+    """
     vertices = np.array(vertices)
     assert len(vertices.shape) == 2
     assert vertices.shape[1] == 2
 
+    if size is None:
+        size = np.ceil(vertices.max(axis=0) - vertices.min(axis=0)).astype(int).tolist()
+    if linewidth is None:
+        linewidth = mpl.rcParams["patch.linewidth"]
+    edgewidth = linewidth * utils.raster.POINTS_TO_PX
+
+    # Image coordinates: x right, y down
+    vertices = vertices * [1, -1] + [0, size[1]]
+    centers, starts, ends, arc_radii, _ = fillet_corners(vertices, radii)
+
+    x0, y0, x1, y1 = _patch_bbox(vertices, edgewidth)
+    left, upper = max(x0, 0), max(y0, 0)
+    right, lower = min(x1, size[0]), min(y1, size[1])
+    right, lower = max(right, left), max(lower, upper)
+
+    # Coverage is only fractional within half a pixel of the outline, or of the edge's borders
+    band = max(edgewidth / 2, 0) + 1
+    box = (left, upper, right, lower)
+    dist = utils.raster.rounded_polygon_pixel_distance(box, centers, starts, ends, arc_radii, band)
+    face, edge = utils.raster.distance_coverage(dist, edgewidth)
+
+    return face, edge, box
+
+
+def colorize_patch(coverage, size, facecolor, edgecolor=None):
+    """
+    Colorize patch coverage, as returned by poly_patch_coverage, to an image
+
+    Parameters
+    ----------
+    coverage : tuple
+        (face, edge, box) tuple
+    size : tuple[int]
+        Image size
+    facecolor : color
+        Face color, as 0-255 integers
+    edgecolor : color
+        Edge color, as 0-255 integers. Defaults to facecolor
+
+    Returns
+    -------
+    img : PIL.Image
+    """
+    face, edge, (left, upper, right, lower) = coverage
+
+    if edgecolor is None:
+        edgecolor = facecolor
+
     # face/edge color must be converted to floats
     facecolor = np.array(facecolor) / 255
     edgecolor = np.array(edgecolor) / 255
 
-    if edgecolor is None:
-        edgecolor = facecolor
+    data = np.zeros((size[1], size[0], 4), dtype=np.uint8)
+    data[upper:lower, left:right] = utils.raster.colorize_coverage(face, edge, facecolor, edgecolor)
 
-    path = compute_path(vertices, radii)
-    patch = PathPatch(path, edgecolor=edgecolor, facecolor=facecolor, linewidth=linewidth)
-    ax.add_patch(patch)
+    return Image.fromarray(data, mode="RGBA")
 
-    utils.mpl.prep_ax(ax)
 
-    ax.set_xlim(0, size[0])
-    ax.set_ylim(0, size[1])
+def poly_patch(vertices, radii, facecolor, edgecolor=None, linewidth=None, size=None):
+    if size is None:
+        size = np.ceil(np.array(vertices).max(axis=0) - np.array(vertices).min(axis=0)).astype(int).tolist()
 
-    img = utils.mpl.fig_to_img(fig, size)
+    coverage = poly_patch_coverage(vertices, radii, linewidth=linewidth, size=size)
 
-    return img
+    return colorize_patch(coverage, size, facecolor, edgecolor)
 
 
 if __name__ == "__main__":
@@ -1,3 +1,5 @@
+from .lattice import Lattice, lattice_pattern
 from .hexagons import hexagons
+from .squares import squares
 from .triangles import triangles
 from .gradient import radial_gradient, linear_gradient
@@ -1,68 +1,126 @@
-import matplotlib as mpl
-import matplotlib.pyplot as plt
 import numpy as np
+from PIL import Image
 
-from ilivery import utils
+from ilivery.colormaps import colormap_from_config
+from ilivery.config.color_configs import LinearSegmentedColorMap
 
 
-def _get_meshgrid(size, N=256):
-    return np.meshgrid(
-        np.linspace(0, size[0], N),
-        np.linspace(0, size[1], N),
-    )
+def _pixel_centers(size):
+    """Pixel center coordinates, x right and y down, broadcastable to shape (height, width)"""
+    x = np.arange(size[0], dtype=float)[None, :] + 0.5
+    y = np.arange(size[1], dtype=float)[:, None] + 0.5
+    return x, y
 
 
-def _img_from_data(size, cmap, data):
-    # data = (data - np.min(data)) / (np.max(data) - np.min(data))
-
-    # fig,ax = utils.mpl.get_fig(size)
-    fig, ax = plt.subplots()
-    ax.imshow(data, cmap=cmap, vmin=np.min(data), vmax=np.max(data), extent=(0, size[0], 0, size[1]))
-
-    utils.mpl.prep_ax(ax)
-
-    img = utils.mpl.fig_to_img(fig, size=size)
-
-    return img
+def _normalize(data):
+    """Scale data to range [0, 1]"""
+    data_range = data.max() - data.min()
+    if data_range == 0:
+        return np.zeros_like(data)
+    return (data - data.min()) / data_range
 
 
 def _get_cmap(colors, cmap):
     if cmap is not None and colors is not None:
-        raise ValueError("")
+        raise ValueError("Only one of cmap and colors may be given")
 
     elif cmap is not None:
         return cmap
 
     else:
-        colors = utils.color.standardize_colors(colors, format="FLOAT")
-        cmap = mpl.colors.LinearSegmentedColormap.from_list(name="", colors=colors)
-        return cmap
-
-
-def linear_gradient(size, cmap=None, colors=None, angle=0):
-    # Negative angle for CC rotation
-    angle = -1 * angle
+        return colormap_from_config(LinearSegmentedColorMap(type="LINEAR_SEGMENTED", colors=colors))
+
+
+def linear_gradient_data(size, angle=0):
+    """
+    Linear gradient values in range [0, 1], increasing along the given direction
+
+    Parameters
+    ----------
+    size : tuple[int]
+        Size tuple
+    angle : float
+        Gradient direction, counterclockwise from the x axis in degrees
+
+    Returns
+    -------
+    data : np.ndarray
+        Gradient values, shape (height, width)
+    """
+    x, y = _pixel_centers(size)
+
+    # Image y runs down, so subtract the y component for counterclockwise angles
+    theta = angle / 180 * np.pi
+    return _normalize(np.cos(theta) * x - np.sin(theta) * y)
+
+
+def radial_gradient_data(size, xy=None):
+    """
+    Radial gradient values in range [0, 1], increasing with distance from xy
+
+    Parameters
+    ----------
+    size : tuple[int]
+        Size tuple
+    xy : tuple[float]
+        Gradient center, in pixels from the top left corner. Defaults to (0, 0)
+
+    Returns
+    -------
+    data : np.ndarray
+        Gradient values, shape (height, width)
+    """
+    if xy is None:
+        xy = (0, 0)
 
-    cmap = _get_cmap(colors, cmap)
+    x, y = _pixel_centers(size)
+    return _normalize(np.hypot(x - xy[0], y - xy[1]))
 
-    XX, YY = _get_meshgrid(size)
 
-    data = np.cos(angle / 180 * np.pi) * XX + np.sin(angle / 180 * np.pi) * YY
+def colorize(data, cmap):
+    """Map gradient values through a colormap's lookup table to an RGBA image"""
+    return Image.fromarray(cmap.lookup(data), mode="RGBA")
 
-    img = _img_from_data(size, cmap, data)
 
-    return img
+def linear_gradient(size, cmap=None, colors=None, angle=0):
+    """
+    Linear gradient image
+
+    Parameters
+    ----------
+    size : tuple[int]
+        Size tuple
+    cmap : Colormap
+        Gradient colormap, mutually exclusive with colors
+    colors : list
+        Colors to fade between, evenly spaced
+    angle : float
+        Gradient direction, counterclockwise from the x axis in degrees
+
+    Returns
+    -------
+    img : PIL.Image
+    """
+    return colorize(linear_gradient_data(size, angle), _get_cmap(colors, cmap))
 
 
 def radial_gradient(size, cmap=None, colors=None, xy=None):
-    if xy is None:
-        xy = (0, 0)
-
-    cmap = _get_cmap(colors, cmap)
-
-    XX, YY = _get_meshgrid(size)
-    data = np.sqrt((XX - xy[0]) ** 2 + (YY - xy[1]) ** 2)
-
-    img = _img_from_data(size, cmap, data)
-
-    return img
+    """
+    Radial gradient image
+
+    Parameters
+    ----------
+    size : tuple[int]
+        Size tuple
+    cmap : Colormap
+        Gradient colormap, mutually exclusive with colors
+    colors : list
+        Colors to fade between, evenly spaced
+    xy : tuple[float]
+        Gradient center, in pixels from the top left corner. Defaults to (0, 0)
+
+    Returns
+    -------
+    img : PIL.Image
+    """
+    return colorize(radial_gradient_data(size, xy), _get_cmap(colors, cmap))
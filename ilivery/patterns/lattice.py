@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+import matplotlib as mpl
+import numpy as np
+
+from ilivery import utils
+from ilivery.patterns.poly_pattern import poly_pattern, cull_to_mask, AggRasterizer, CHUNK_SIZE
+from ilivery.patterns.stamp import StampRasterizer
+
+
+def _transform_shape(verts, xy, scale, angle):
+    verts = np.array(verts)
+    angle = angle % 360
+    if angle != 0:
+        angle *= -1  # Otherwise, we rotate clockwise (need to rotate counterclockwise)
+        angle = np.pi * angle / 180
+        rot_matrix = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        verts = np.matmul(verts, rot_matrix)
+
+    verts = verts * scale + np.array(xy)
+
+    return verts
+
+
+class Lattice:
+    """
+    A periodic polygon lattice. All lengths are given for a cell size of 1.
+
+    prototype: Verticies of a single cell polygon, centered at (0, 0)
+    basis: The two lattice basis vectors
+    motif: List of (offset, rotation) pairs, one per cell in each lattice repeat. Each cell is
+        the prototype rotated by `rotation` degrees and placed at `offset` from the lattice point.
+        Defaults to a single, unrotated cell at each lattice point.
+    """
+
+    def __init__(self, prototype, basis, motif=None):
+        self.prototype = np.array(prototype, dtype=float)
+        self.basis = np.array(basis, dtype=float)
+
+        if motif is None:
+            motif = [((0, 0), 0)]
+        self.offsets = np.array([offset for offset, _ in motif], dtype=float)
+        self.rotations = [rotation for _, rotation in motif]
+
+        if self.prototype.ndim != 2 or self.prototype.shape[1] != 2 or len(self.prototype) < 3:
+            raise ValueError(f"Prototype must be a list of at least 3 (x, y) verticies, got {self.prototype.tolist()}")
+        if self.basis.shape != (2, 2) or np.linalg.det(self.basis) == 0:
+            raise ValueError(f"Basis must be two linearly independent vectors, got {self.basis.tolist()}")
+
+    @property
+    def radius(self):
+        """Prototype circumradius"""
+        return np.sqrt((self.prototype**2).sum(axis=1)).max()
+
+    def cell_verts(self, angle):
+        """Prototype verticies for each motif cell, rotated by angle, with shape (n_motif, n_verts, 2)"""
+        return np.stack([_transform_shape(self.prototype, xy=(0, 0), scale=1, angle=angle + r) for r in self.rotations])
+
+    def grid(self, size, cell_size, angle=0, spacing=0):
+        """
+        Get the centers of all cells that lie within one cell size of the canvas
+
+        Cells are ordered column by column in the unrotated lattice frame.
+
+        Returns
+        -------
+        centers : np.ndarray
+            Cell centers, shape (n, 2)
+        motif : np.ndarray
+            Motif index of each cell, shape (n,)
+        """
+        scale = cell_size + spacing
+        margin = cell_size * max(1, self.radius)
+
+        # Bound the lattice indices by mapping the (padded) canvas corners back into lattice coordinates
+        corners = np.array(
+            [
+                [-margin, -margin],
+                [size[0] + margin, -margin],
+                [-margin, size[1] + margin],
+                [size[0] + margin, size[1] + margin],
+            ]
+        )
+        inv_rotation = np.linalg.inv(_transform_shape(np.eye(2), xy=(0, 0), scale=1, angle=angle))
+        corners = (corners / scale) @ inv_rotation
+        ij = np.concatenate([(corners - offset) @ np.linalg.inv(self.basis) for offset in self.offsets])
+        i_min, j_min = np.floor(ij.min(axis=0)).astype(int) - 1
+        i_max, j_max = np.ceil(ij.max(axis=0)).astype(int) + 1
+
+        i, j, m = np.meshgrid(
+            np.arange(i_min, i_max + 1),
+            np.arange(j_min, j_max + 1),
+            np.arange(len(self.offsets)),
+            indexing="ij",
+        )
+        i, j, m = i.ravel(), j.ravel(), m.ravel()
+
+        points = i[:, None] * self.basis[0] + j[:, None] * self.basis[1] + self.offsets[m]
+
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        points, m = points[order], m[order]
+
+        # Rotate/scale grid
+        centers = _transform_shape(points, xy=(0, 0), scale=scale, angle=angle)
+
+        # Prune grid
+        keep = (
+            (centers[:, 0] > -margin)
+            & (centers[:, 0] < size[0] + margin)
+            & (centers[:, 1] > -margin)
+            & (centers[:, 1] < size[1] + margin)
+        )
+
+        return centers[keep], m[keep]
+
+
+def lattice_pattern(
+    lattice,
+    cell_size,
+    size,
+    angle=0,
+    face_cmap=None,
+    face_cfunc=None,
+    facecolor=None,
+    edgecolor=None,
+    spacing=0,
+    edgewidth=None,
+    facespec=None,
+    facespec_cmap=None,
+    facespec_cfunc=None,
+    edgespec=None,
+    c_min=0,
+    c_max=1,
+    mask=None,
+    rasterizer="AGG",
+    chunk_size=CHUNK_SIZE,
+):
+    """
+    Create a polygon pattern from a lattice
+
+    Parameters
+    ----------
+    lattice : Lattice
+        Lattice to draw
+    cell_size : float
+        Cell size, in pixels
+    size : tuple[int]
+        Size tuple
+    angle : float
+        Pattern angle, counterclockwise in degrees
+    edgewidth : float
+        Cell outline width, in points. Defaults to matplotlib's default patch line width
+    mask : PIL.Image
+        Optional section mask. Cells entirely outside the mask are not drawn
+    rasterizer : str
+        AGG draws every cell with matplotlib. STAMP composites coverage stamps pre-rendered for the
+        cell prototypes, which is much faster for patterns with many cells
+    chunk_size : int
+        Number of cells rasterized at a time, bounding peak memory for patterns with many cells
+
+    See poly_pattern for the remaining parameters
+
+    Returns
+    -------
+    img : PIL.Image
+        Pattern image
+    spec : PIL.Image
+        Pattern specmap
+    """
+    centers, motif = lattice.grid(size=size, cell_size=cell_size, angle=angle, spacing=spacing)
+
+    # Cell outlines are drawn at edgewidth, in points
+    if edgewidth is None:
+        edgewidth = mpl.rcParams["patch.linewidth"]
+
+    visible = None
+    if mask is not None:
+        margin = cell_size * max(1, lattice.radius) + edgewidth * utils.raster.POINTS_TO_PX / 2
+        visible = cull_to_mask(centers, size=size, mask=mask, margin=margin)
+
+    cell_verts = lattice.cell_verts(angle)
+    drawn_centers = centers if visible is None else centers[visible]
+    drawn_motif = motif if visible is None else motif[visible]
+
+    if rasterizer == "AGG":
+        rasterizer = AggRasterizer(
+            size, drawn_centers, drawn_motif, cell_verts * cell_size, edgewidth, chunk_size=chunk_size
+        )
+    elif rasterizer == "STAMP":
+        rasterizer = StampRasterizer(
+            size, drawn_centers, drawn_motif, cell_verts * cell_size, edgewidth, chunk_size=chunk_size
+        )
+    else:
+        raise ValueError(f"Unknown rasterizer: {rasterizer}")
+
+    return poly_pattern(
+        size=size,
+        centers=centers,
+        visible=visible,
+        facecolor=facecolor,
+        face_cmap=face_cmap,
+        face_cfunc=face_cfunc,
+        edgecolor=edgecolor,
+        edgewidth=edgewidth,
+        facespec=facespec,
+        facespec_cmap=facespec_cmap,
+        facespec_cfunc=facespec_cfunc,
+        edgespec=edgespec,
+        c_min=c_min,
+        c_max=c_max,
+        rasterizer=rasterizer,
+    )
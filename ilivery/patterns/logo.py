@@ -1,5 +1,9 @@
+import functools
+
 import numpy as np
-from PIL import Image, ImageDraw
+from PIL import Image
+
+from ilivery import utils
 
 
 def _get_verts(a, b, c):
@@ -45,58 +49,112 @@ def _get_verts(a, b, c):
     return main_verts, aux_verts, center, radius
 
 
-def _crop_transparent(img):
-    img_data = np.array(img)
-
-    x = np.argwhere(img_data[:, :, 3] > 0)
+def _crop_transparent(face, edge):
+    x = np.argwhere((face > 0) | (edge > 0))
 
-    cropped_img_data = img_data[np.min(x[:, 0]) : np.max(x[:, 0]), np.min(x[:, 1]) : np.max(x[:, 1]), :]
+    rows = slice(np.min(x[:, 0]), np.max(x[:, 0]))
+    cols = slice(np.min(x[:, 1]), np.max(x[:, 1]))
 
-    img_out = Image.fromarray(cropped_img_data)
+    return face[rows, cols], edge[rows, cols]
 
-    return img_out
 
+# The logo used to be drawn on a 4x supersampled canvas, with edge widths given in that canvas's pixels
+EDGE_SCALE = 1 / 4
 
-def logo(size, facecolor, edgecolor, edgewidth=None, edgeratio=None, pad="TIGHT"):
-    """ """
-    pad = pad.upper()
-    assert pad.upper() in ["TIGHT", "CIRCLE"]
-
-    target_size = size
 
+@functools.lru_cache(maxsize=16)
+def _logo_coverage(size, edgewidth, edgeratio, pad):
+    """Cached logo coverage, see logo_coverage. The returned arrays are read only"""
     if edgeratio:
-        edgewidth = int(target_size * edgeratio)
-
-    aa_factor = 4
-
-    size = tuple([target_size * aa_factor for i in range(2)])
+        edgewidth = int(size * edgeratio)
 
     b = 0.18
     c = b / 4
-    main_verts, aux_verts, center, radius = _get_verts(size[0], b, c)
+    a = size / EDGE_SCALE
+    main_verts, aux_verts, center, radius = _get_verts(a, b, c)
 
-    img = Image.new(mode="RGBA", size=(2 * radius, 2 * radius))  # , color=(255, 255, 255, 255))
+    # Map the logo's layout canvas onto the output grid, flipping y
+    target = int(2 * radius * EDGE_SCALE)
+    scale = target / (2 * radius)
 
-    draw = ImageDraw.Draw(img)
-    draw.polygon(main_verts, fill=facecolor)
-    draw.polygon(aux_verts, fill=facecolor)
-    if edgewidth:
-        edge_verts = main_verts + main_verts[:2]
-        edge_aux_verts = aux_verts + aux_verts[:2]
-        draw.line(edge_verts, fill=edgecolor, width=edgewidth, joint="curve")
-        draw.line(edge_aux_verts, fill=edgecolor, width=edgewidth, joint="curve")
+    def _to_grid(verts):
+        verts = np.array(verts, dtype=float)
+        return np.stack([verts[:, 0], 2 * radius - verts[:, 1]], axis=1) * scale
 
-    img = img.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+    x = np.arange(target, dtype=float)[None, :] + 0.5
+    y = np.arange(target, dtype=float)[:, None] + 0.5
+    main_dist = utils.raster.polygon_distance(x, y, _to_grid(main_verts))
+    aux_dist = utils.raster.polygon_distance(x, y, _to_grid(aux_verts))
 
-    img = img.resize(
-        (int(img.size[0] / aa_factor), int(img.size[1] / aa_factor)),
-        resample=Image.Resampling.BICUBIC,
-    )
+    # Both polygons are outlined, so the edge is the union of the two outlines
+    edgewidth = (edgewidth or 0) * scale
+    face, _ = utils.raster.distance_coverage(np.minimum(main_dist, aux_dist), edgewidth)
+    _, aux_edge = utils.raster.distance_coverage(aux_dist, edgewidth)
+    _, main_edge = utils.raster.distance_coverage(main_dist, edgewidth)
+    edge = np.maximum(main_edge, aux_edge)
 
     if pad == "TIGHT":
-        img = _crop_transparent(img)
+        face, edge = _crop_transparent(face, edge)
+
+    face = np.ascontiguousarray(face)
+    edge = np.ascontiguousarray(edge)
+    face.flags.writeable = False
+    edge.flags.writeable = False
+
+    return face, edge
+
+
+def logo_coverage(size, edgewidth=None, edgeratio=None, pad="TIGHT"):
+    """
+    Anti-aliased face and edge coverage of the logo
+
+    Coverage is computed analytically from the distance to the logo outline, and cached per (size, edgewidth,
+    edgeratio, pad). Colorize it any number of times with colorize_logo, eg. for both paint and spec.
+
+    Parameters
+    ----------
+    size : int
+        Logo size, in pixels
+    edgewidth : float
+        Edge width, in units of EDGE_SCALE pixels
+    edgeratio : float
+        Edge width as a fraction of size, overrides edgewidth
+    pad : str
+        TIGHT crops to the logo, CIRCLE keeps the logo's bounding circle
+
+    Returns
+    -------
+    face : np.ndarray
+        Face coverage, float32, read only
+    edge : np.ndarray
+        Edge coverage, with the same shape as face
+    """
+    pad = pad.upper()
+    if pad not in ["TIGHT", "CIRCLE"]:
+        raise ValueError(f"Unknown pad: {pad}")
 
-    return img
+    return _logo_coverage(size, edgewidth, edgeratio, pad)
+
+
+def colorize_logo(coverage, facecolor, edgecolor):
+    """
+    Colorize logo coverage, as returned by logo_coverage, to an image
+
+    Colors are given as 0-255 integers. A color of None is left transparent
+    """
+    face, edge = coverage
+
+    def _float_color(color):
+        return (0, 0, 0, 0) if color is None else np.array(color) / 255
+
+    data = utils.raster.colorize_coverage(face, edge, _float_color(facecolor), _float_color(edgecolor))
+
+    return Image.fromarray(data, mode="RGBA")
+
+
+def logo(size, facecolor, edgecolor, edgewidth=None, edgeratio=None, pad="TIGHT"):
+    """ """
+    return colorize_logo(logo_coverage(size, edgewidth=edgewidth, edgeratio=edgeratio, pad=pad), facecolor, edgecolor)
 
 
 if __name__ == "__main__":
@@ -105,5 +163,5 @@ if __name__ == "__main__":
     e = (189, 22, 22, 255)
 
     logo_size = 512
-    img = logo(size=(logo_size, logo_size), facecolor=f, edgecolor=e, edgewidth=20, pad="CIRCLE")
+    img = logo(size=logo_size, facecolor=f, edgecolor=e, edgewidth=20, pad="CIRCLE")
     img.show()
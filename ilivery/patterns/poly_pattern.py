@@ -1,64 +1,151 @@
 #!/usr/bin/env python3
 import matplotlib as mpl
+import numpy as np
 from PIL import Image
 
 from ilivery import utils
 
 
+def cull_to_mask(centers, size, mask, margin):
+    """
+    Determine which polygons can touch the section mask
+
+    Parameters
+    ----------
+    centers : np.ndarray
+        Polygon centers, shape (n, 2), with y up (as plotted)
+    size : tuple[int]
+        Pattern size
+    mask : PIL.Image
+        Section mask, cropped to the pattern size. Pixels with any opacity, including anti-aliased edges, are
+        inside the section
+    margin : float
+        Half-width of the box around each center that contains the full polygon, including its edge
+
+    Returns
+    -------
+    visible : np.ndarray
+        Boolean array, False for polygons that fall entirely outside the mask
+    """
+    table = utils.img.summed_area_table(np.array(mask)[:, :, 3] > 0)
+
+    # Mask rows run top to bottom, the pattern's y axis runs bottom to top
+    x = centers[:, 0]
+    y = size[1] - centers[:, 1]
+
+    return utils.img.boxes_intersect_mask(table, x - margin, y - margin, x + margin, y + margin)
+
+
+# Number of polygons rasterized at a time. Bounds the memory used by matplotlib collections and stamp
+# accumulation when patterns have millions of cells
+CHUNK_SIZE = 65536
+
+
+def _chunk_colors(colors, n, start, stop):
+    """Slice per-polygon colors to a chunk, passing a single color through"""
+    colors = np.asarray(colors)
+    if colors.ndim == 2 and len(colors) == n:
+        return colors[start:stop]
+    return colors
+
+
+class AggRasterizer:
+    """
+    Rasterize polygons with matplotlib's Agg backend
+
+    Each polygon is one of a few motif polygons, translated to its center. Verticies are only built for one
+    chunk of polygons at a time, so peak memory is bounded by the chunk size rather than the number of polygons.
+
+    Parameters
+    ----------
+    size : tuple[int]
+        Image size
+    centers : np.ndarray
+        Polygon centers, shape (n, 2)
+    motif : np.ndarray
+        Motif index of each polygon, shape (n,)
+    cell_verts : np.ndarray
+        Verticies of each motif polygon relative to its center, shape (n_motif, n_verts, 2)
+    edgewidth : float
+        Edge width, in points
+    chunk_size : int
+        Number of polygons drawn at a time
+    """
+
+    def __init__(self, size, centers, motif, cell_verts, edgewidth=None, chunk_size=CHUNK_SIZE):
+        self._size = size
+        self._centers = centers
+        self._motif = motif
+        self._cell_verts = cell_verts
+        self._edgewidth = edgewidth
+        self._chunk_size = chunk_size
+        self._renderer = None
+
+    def render(self, facecolor, edgecolor):
+        n = len(self._centers)
+
+        # The same canvas is reused for every render of these polygons
+        if self._renderer is None:
+            self._renderer = utils.mpl.AggRenderer(self._size)
+        self._renderer.clear()
+
+        # Draw each chunk onto the canvas and discard it
+        for start in range(0, n, self._chunk_size):
+            stop = min(start + self._chunk_size, n)
+            verts = self._cell_verts[self._motif[start:stop]] + self._centers[start:stop, None, :]
+            poly_col = mpl.collections.PolyCollection(
+                verts=verts,
+                facecolors=_chunk_colors(facecolor, n, start, stop),
+                edgecolors=_chunk_colors(edgecolor, n, start, stop),
+                linewidths=self._edgewidth,
+            )
+            self._renderer.draw(poly_col)
+
+        return self._renderer.to_img()
+
+
 def _single_poly_pattern(
-    size,
-    poly_df,
+    centers,
+    rasterizer,
+    visible=None,
     color=None,
     cmap=None,
     cfunc=None,
     edgecolor=None,
-    edgewidth=None,
     c_min=0,
     c_max=1,
 ):
-    poly_df = poly_df.copy()
     if cmap:
-        # Compute cvalue
-        poly_df["c_val"] = cfunc(poly_df["x"], poly_df["y"])
+        # Compute cvalue. Computed for all polygons, as color values are normalized over the full pattern
+        c_val = cfunc(centers[:, 0], centers[:, 1])
 
         # Adjust to cmin/cmax
-        poly_df["c_val"] = poly_df["c_val"] * (c_max - c_min) + c_min
+        c_val = c_val * (c_max - c_min) + c_min
 
-        # Apply
-        poly_df["facecolor"] = poly_df["c_val"].apply(cmap)
+        if visible is not None:
+            c_val = c_val[visible]
+
+        # Apply, as a single gather from the colormap's uint8 lookup table
+        facecolor = cmap.lookup(c_val) / 255
 
     elif color:
-        color = utils.color.standardize_colors(color)
-        poly_df["facecolor"] = [color] * len(poly_df)
+        facecolor = utils.color.standardize_colors(color)
     else:
-        poly_df["facecolor"] = [(0, 0, 0, 0)] * len(poly_df)
+        facecolor = (0, 0, 0, 0)
 
     if edgecolor:
         edgecolor = utils.color.standardize_colors(edgecolor)
-        poly_df["edgecolor"] = [edgecolor] * len(poly_df)
     else:
-        poly_df["edgecolor"] = [(0, 0, 0, 0)] * len(poly_df["facecolor"])
-
-    poly_col = mpl.collections.PolyCollection(
-        verts=poly_df["verts"],
-        facecolors=poly_df["facecolor"],
-        edgecolors=poly_df["edgecolor"],
-        linewidths=edgewidth,
-    )
+        edgecolor = (0, 0, 0, 0)
 
-    fig, ax = utils.mpl.get_fig(size)
-    ax.add_collection(poly_col)
-    ax.set_xlim(0, size[0])
-    ax.set_ylim(0, size[1])
-
-    utils.mpl.prep_ax(ax)
-    paint = utils.mpl.fig_to_img(fig, size)
-    return paint
+    return rasterizer.render(facecolor, edgecolor)
 
 
 def poly_pattern(
     size,
-    poly_df,
+    centers,
+    verts=None,
+    visible=None,
     facecolor=None,
     face_cmap=None,
     face_cfunc=None,
@@ -70,22 +157,24 @@ def poly_pattern(
     edgespec=None,
     c_min=0,
     c_max=1,
+    rasterizer=None,
 ):
     """
-    Create a polygon pattern from a poly_verts df
+    Create a polygon pattern from arrays of polygon centers and verticies
 
     Parameters
     ----------
     size : tuple[int]
         Size tuple
-    poly_df : pd.DataFrame
-        Dataframe, one row per polygon, with following columns:
-            x,y : float
-                polygon center
-            verts : list
-                List of polygon verticies
-    cmap : func
-        Colormap function. Must take a value in range [0,1) and return a color
+    centers : np.ndarray
+        Polygon centers, shape (n, 2). Color functions are evaluated at the centers
+    verts : np.ndarray
+        Polygon verticies, shape (n_visible, n_verts, 2)
+    visible : np.ndarray
+        Optional boolean array, shape (n,). If given, only the visible polygons are drawn, and
+        `verts` holds verticies for the visible polygons only
+    cmap : Colormap
+        Colormap, with a `lookup` method mapping values in range [0,1) to uint8 colors
     cfunc : func
         Color function, must take an (x,y) pair and return a scalar value
     edgecolor : color
@@ -96,6 +185,9 @@ def poly_pattern(
         Specmap for faces
     edgespec : color
         Specmap for edges
+    rasterizer : object
+        Optional rasterizer for the visible polygons, with a `render(facecolor, edgecolor)` method
+        returning an image. Defaults to an AggRasterizer over `verts`
 
     Returns
     -------
@@ -104,9 +196,15 @@ def poly_pattern(
     spec : PIL.Image
         Poly specmap, if facespec or edgespec are not None
     """
+    if rasterizer is None:
+        # Each polygon is its own motif, at the origin
+        verts = np.asarray(verts, dtype=float)
+        rasterizer = AggRasterizer(size, np.zeros((len(verts), 2)), np.arange(len(verts)), verts, edgewidth)
+
     kwargs = {
-        "size": size,
-        "poly_df": poly_df,
+        "centers": centers,
+        "rasterizer": rasterizer,
+        "visible": visible,
         "c_min": c_min,
         "c_max": c_max,
     }
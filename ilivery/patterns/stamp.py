@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from PIL import Image
+
+from ilivery import utils
+from ilivery.patterns.poly_pattern import CHUNK_SIZE, _chunk_colors
+
+
+class StampRasterizer:
+    """
+    Rasterize lattice cells by compositing pre-rendered coverage stamps
+
+    Every cell of a lattice is a translated copy of one of a few motif polygons. Coverage stamps are
+    rendered once for each motif polygon, at `subpixel` x `subpixel` quantized sub-pixel offsets, and
+    each cell is drawn by accumulating the matching stamp at its integer pixel position.
+
+    Faces are accumulated additively, so the anti-aliased borders of neighboring cells blend without
+    seams. Outlines are combined as repeated 'over' compositing of the single edge color.
+
+    Cells are accumulated in no particular order, so the result matches AggRasterizer inside the cells, but
+    not along their outlines, where AggRasterizer paints each cell over the previous ones:
+
+    - Shared borders between faces are fully opaque, where AggRasterizer leaves them partly transparent
+    - Where cells overlap (eg. hexagons), overlapping faces are averaged rather than painted over, and
+      every outline is drawn on top of all faces, so both neighbors' outlines show and appear thicker
+
+    Parameters
+    ----------
+    size : tuple[int]
+        Image size
+    centers : np.ndarray
+        Centers of the cells to draw, shape (n, 2), with y up
+    motif : np.ndarray
+        Motif index of each cell, shape (n,)
+    cell_verts : np.ndarray
+        Verticies of each motif polygon relative to its center, shape (n_motif, n_verts, 2), with y up
+    edgewidth : float
+        Edge width, in points
+    subpixel : int
+        Number of quantized sub-pixel offsets, in each direction
+    supersample : int
+        Samples per pixel used to render the stamps, in each direction
+    chunk_size : int
+        Number of cells accumulated at a time
+    """
+
+    def __init__(
+        self, size, centers, motif, cell_verts, edgewidth=None, subpixel=4, supersample=8, chunk_size=CHUNK_SIZE
+    ):
+        self._size = size
+        self._chunk_size = chunk_size
+        edgewidth = (edgewidth or 0) * utils.raster.POINTS_TO_PX
+
+        # Image coordinates: x right, y down
+        cell_verts = np.asarray(cell_verts) * [1, -1]
+        x = centers[:, 0]
+        y = size[1] - centers[:, 1]
+
+        # Split cell positions into integer pixels and quantized sub-pixel offsets
+        qx = np.round(x * subpixel).astype(int)
+        qy = np.round(y * subpixel).astype(int)
+        ix, fx = np.divmod(qx, subpixel)
+        iy, fy = np.divmod(qy, subpixel)
+
+        # Render stamps, keeping only their nonzero pixels. Pixel offsets are relative to the integer position
+        pad = edgewidth / 2 + 1
+        self._stamps = []
+        for verts in cell_verts:
+            u0, v0 = np.floor(verts.min(axis=0) - pad).astype(int)
+            u1, v1 = np.ceil(verts.max(axis=0) + 1 + pad).astype(int)
+
+            for j in range(subpixel):
+                for i in range(subpixel):
+                    face, edge = utils.raster.polygon_coverage(
+                        verts - [u0, v0] + [i / subpixel, j / subpixel],
+                        shape=(v1 - v0, u1 - u0),
+                        edgewidth=edgewidth,
+                        supersample=supersample,
+                    )
+                    rows, cols = np.nonzero((face > 0) | (edge > 0))
+                    self._stamps.append((rows + v0, cols + u0, face[rows, cols], edge[rows, cols]))
+
+        # Accumulate onto a canvas padded by the largest stamp extent, so that stamps never need clipping
+        extent = max(np.abs(np.concatenate([rows, cols, [0]])).max() for rows, cols, _, _ in self._stamps)
+        overhang = max(0, -ix.min(), -iy.min(), ix.max() - size[0], iy.max() - size[1]) if len(centers) else 0
+        self._pad = int(extent + overhang + 1)
+
+        self._ix = ix
+        self._iy = iy
+        self._stamp_index = (motif * subpixel + fy) * subpixel + fx
+        self._n_cells = len(centers)
+
+    def _chunks(self):
+        """Yield (start, stop, groups) for each chunk of cells, grouping the chunk's cells by stamp index"""
+        for start in range(0, self._n_cells, self._chunk_size):
+            stop = min(start + self._chunk_size, self._n_cells)
+            stamp_index = self._stamp_index[start:stop]
+
+            order = np.argsort(stamp_index, kind="stable")
+            keys, first = np.unique(stamp_index[order], return_index=True)
+
+            yield start, stop, zip(keys, np.split(order + start, first[1:]))
+
+    def _stamp_indices(self, k, cells):
+        """Flat canvas indices of every stamp pixel, for all cells drawn with stamp k"""
+        rows, cols, _, _ = self._stamps[k]
+        width = self._size[0] + 2 * self._pad
+
+        origins = (self._iy[cells] + self._pad) * width + self._ix[cells] + self._pad
+
+        return (origins[:, None] + (rows * width + cols)).ravel()
+
+    def render(self, facecolor, edgecolor):
+        """
+        Render the cells
+
+        Parameters
+        ----------
+        facecolor : color
+            Single float color, or array of float colors with one color per cell
+        edgecolor : color
+            Single float color
+
+        Returns
+        -------
+        img : PIL.Image
+        """
+        width, height = [s + 2 * self._pad for s in self._size]
+        edgecolor = utils.raster.to_rgba(edgecolor, 1)[0]
+
+        # A single face color only needs the total coverage, otherwise accumulate premultiplied colors
+        uniform = np.ndim(facecolor) == 1
+        facecolor = utils.raster.to_rgba(facecolor, 1 if uniform else self._n_cells)
+        facecolor[:, :3] *= facecolor[:, 3:]
+
+        # Repeated 'over' of a single color: alpha = 1 - prod(1 - a)
+        edge_log = [-np.log1p(-np.minimum(edge * edgecolor[3], 1 - 1e-6)) for _, _, _, edge in self._stamps]
+
+        face_acc = np.zeros((1 if uniform else 4, width * height), dtype=np.float32)
+        edge_acc = np.zeros(width * height, dtype=np.float32)
+
+        def _accumulate(acc, indices, weights):
+            # Only touch the span of the canvas covered by this chunk
+            lo = indices.min()
+            acc[lo : lo + indices.max() - lo + 1] += np.bincount(indices - lo, weights)
+
+        for start, stop, groups in self._chunks():
+            indices, face_weights, edge_weights = [], [], []
+            chunk_colors = _chunk_colors(facecolor, self._n_cells, start, stop)
+
+            for k, cells in groups:
+                _, _, face_stamp, _ = self._stamps[k]
+                indices.append(self._stamp_indices(k, cells))
+
+                if uniform:
+                    face_weights.append(np.tile(face_stamp, (1, len(cells))))
+                else:
+                    face_weights.append((chunk_colors[cells - start].T[:, :, None] * face_stamp).reshape(4, -1))
+                edge_weights.append(np.tile(edge_log[k], len(cells)))
+
+            indices = np.concatenate(indices)
+            face_weights = np.concatenate(face_weights, axis=-1)
+            for c in range(len(face_acc)):
+                _accumulate(face_acc[c], indices, face_weights[c])
+            if edgecolor[3] > 0:
+                _accumulate(edge_acc, indices, np.concatenate(edge_weights))
+
+        def _crop(acc):
+            return acc.reshape(height, width)[self._pad : height - self._pad, self._pad : width - self._pad]
+
+        if uniform:
+            coverage = _crop(face_acc[0])
+            face = [coverage * c for c in facecolor[0]]
+        else:
+            face = [_crop(acc) for acc in face_acc]
+
+        # Overlapping faces are averaged
+        scale = 1 / np.maximum(face[3], 1)
+        face = [f * scale for f in face]
+
+        edge_alpha = -np.expm1(-_crop(edge_acc))
+
+        data = np.empty((*edge_alpha.shape, 4), dtype=np.uint8)
+        alpha = edge_alpha + face[3] * (1 - edge_alpha)
+        data[:, :, 3] = np.round(np.clip(alpha, 0, 1) * 255)
+        alpha[alpha == 0] = 1
+        for c in range(3):
+            rgb = (edgecolor[c] * edge_alpha + face[c] * (1 - edge_alpha)) / alpha
+            data[:, :, c] = np.round(np.clip(rgb, 0, 1) * 255)
+
+        return Image.fromarray(data, mode="RGBA")
@@ -1,33 +1,228 @@
-from ilivery import TEXTURE_DIR
+#!/usr/bin/env python3
+
+import functools
+import hashlib
+import logging
+import threading
 
 import numpy as np
 from PIL import Image
 
+from ilivery import TEXTURE_DIR, TEXTURE_CACHE_DIR, utils
+from ilivery.layer import Layer
+
+logger = logging.getLogger(__name__)
+
+# Source images of a texture folder
+PAINT_FILE = "texture.jpg"
+METALLIC_FILE = "spec_metallic.jpg"
+ROUGHNESS_FILE = "spec_roughness.jpg"
+SOURCE_FILES = (PAINT_FILE, METALLIC_FILE, ROUGHNESS_FILE)
+
+# Texture names that do not match their folder name
+TEXTURE_ALIASES = {
+    "CARBON_FIBER": "carbon_fiber_2",
+}
+
+
+def _tile_indices(start, stop, n, tiling):
+    """Source indices of positions start to stop, tiling a source of length n"""
+    i = np.arange(start, stop)
+    if tiling == "REPEAT":
+        return i % n
+    elif tiling == "MIRROR":
+        i = i % (2 * n)
+        return np.where(i < n, i, 2 * n - 1 - i)
+    else:
+        raise ValueError(f"Unknown tiling: {tiling}")
+
+
+class Texture:
+    """
+    Preprocessed texture, memory mapped from the texture cache
+
+    The cache file holds the texture's paint and spec as a single uint8 array, shape (2, height, width, 4),
+    so textures are never decoded again once preprocessed. Only the rows and columns of a region are read
+    from the map, so the I/O is bounded by the texture size however large the region.
+
+    Parameters
+    ----------
+    path : Path
+        Cache file, as written by preprocess
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._data = np.load(path, mmap_mode="r")
+
+    @property
+    def size(self):
+        return (self._data.shape[2], self._data.shape[1])
+
+    def layer(self, size, origin=(0, 0), tiling="REPEAT"):
+        """
+        Texture layer over a region, tiling the texture beyond its bounds
+
+        Parameters
+        ----------
+        size : tuple[int]
+            Region size
+        origin : tuple[int]
+            Upper left corner of the region, in texture coordinates. Layers built for neighbouring regions
+            of the same texture line up seamlessly
+        tiling : str
+            REPEAT wraps the texture around, and is seamless for periodic textures. MIRROR reflects every
+            other tile, and is seamless for any texture
+
+        Returns
+        -------
+        layer : Layer
+        """
+        (left, top), (width, height) = origin, self.size
+        right, bottom = left + size[0], top + size[1]
+
+        if 0 <= left and right <= width and 0 <= top and bottom <= height:
+            data = self._data[:, top:bottom, left:right]
+        else:
+            rows = _tile_indices(top, bottom, height, tiling)
+            cols = _tile_indices(left, right, width, tiling)
+
+            # Read the block of the texture the region needs once, then tile it
+            r0, c0 = rows.min(), cols.min()
+            block = np.asarray(self._data[:, r0 : rows.max() + 1, c0 : cols.max() + 1])
+            data = block[:, rows - r0][:, :, cols - c0]
+
+        return Layer.from_image(Image.fromarray(data[0], mode="RGBA"), Image.fromarray(data[1], mode="RGBA"))
+
+
+def _is_texture_dir(path):
+    return path.is_dir() and all((path / f).exists() for f in SOURCE_FILES)
+
+
+def texture_names(texture_dir=None):
+    """
+    Names of every texture in the texture directory: the upper case name of each folder holding the
+    texture source files, plus TEXTURE_ALIASES
+    """
+    texture_dir = TEXTURE_DIR if texture_dir is None else texture_dir
+
+    names = {path.name.upper() for path in texture_dir.iterdir() if _is_texture_dir(path)}
+    names.update(name for name, folder in TEXTURE_ALIASES.items() if _is_texture_dir(texture_dir / folder))
+
+    return sorted(names)
+
+
+def _source_dir(name, texture_dir):
+    folder = TEXTURE_ALIASES.get(name.upper(), name.lower())
+    path = texture_dir / folder
+    if not _is_texture_dir(path):
+        raise ValueError(f"Unknown texture: {name}")
+
+    return path
+
+
+def _source_hash(source_dir):
+    """Combined content hash of a texture's source files"""
+    digest = hashlib.sha256()
+    for f in SOURCE_FILES:
+        digest.update(utils.cache.file_hash(source_dir / f).encode())
+
+    return digest.hexdigest()[:16]
+
+
+def preprocess(source_dir):
+    """
+    Decode a texture folder to paint and spec arrays
+
+    The spec takes its metallic (red) channel from spec_metallic.jpg and its roughness (green) channel from
+    spec_roughness.jpg. Paint and spec are fully opaque.
+
+    Returns
+    -------
+    data : np.ndarray
+        uint8 paint and spec, shape (2, height, width, 4)
+    """
+    paint = Image.open(source_dir / PAINT_FILE).convert("RGBA")
+    metallic = np.asarray(Image.open(source_dir / METALLIC_FILE).convert("RGB"))
+    roughness = np.asarray(Image.open(source_dir / ROUGHNESS_FILE).convert("RGB"))
+
+    data = np.zeros((2, paint.size[1], paint.size[0], 4), dtype=np.uint8)
+    data[0] = np.asarray(paint)
+    data[1, :, :, 0] = metallic[:, :, 0]
+    data[1, :, :, 1] = roughness[:, :, 1]
+    data[1, :, :, 3] = 255
+
+    return data
+
+
+@functools.lru_cache(maxsize=32)
+def _open(path):
+    # Cache files are named by source hash, so an open memory map never goes stale
+    return Texture(path)
+
+
+_lock = threading.Lock()
+
+
+def _cache_texture(source_dir, cache_dir):
+    """Cache file of a texture folder, preprocessing it if it has not been cached yet"""
+    path = cache_dir / f"{source_dir.name}-{_source_hash(source_dir)}.npy"
+
+    with _lock:
+        if not path.exists():
+            logger.info(f"Preprocessing texture {source_dir.name}")
+            data = preprocess(source_dir)
+
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            utils.os.write_atomic(path, lambda f: np.save(f, data))
+
+            # Remove caches of older versions of the texture
+            for stale in cache_dir.glob(f"{source_dir.name}-*.npy"):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+
+    return path
+
+
+def load_texture(name, texture_dir=None, cache_dir=None):
+    """
+    Load a texture by name, preprocessing it into the texture cache on first use
 
-def carbon_fiber(size=(2048, 2048)):
-    texture_dir = TEXTURE_DIR / "carbon_fiber_2"
+    Parameters
+    ----------
+    name : str
+        Texture name, see texture_names
+    texture_dir : Path
+        Texture directory. Defaults to TEXTURE_DIR
+    cache_dir : Path
+        Texture cache directory. Defaults to TEXTURE_CACHE_DIR
 
-    texture = Image.open(texture_dir / "texture.jpg")
-    spec_metallic = Image.open(texture_dir / "spec_metallic.jpg")
-    spec_roughness = Image.open(texture_dir / "spec_roughness.jpg")
+    Returns
+    -------
+    texture : Texture
+    """
+    texture_dir = TEXTURE_DIR if texture_dir is None else texture_dir
+    cache_dir = TEXTURE_CACHE_DIR if cache_dir is None else cache_dir
 
-    spec_array = np.array(spec_metallic)
-    spec_array[:, :, 1] = 0
-    spec_array[:, :, 2] = 0
+    return _open(_cache_texture(_source_dir(name, texture_dir), cache_dir))
 
-    spec_array[:, :, 1] = np.array(spec_roughness)[:, :, 1]
 
-    spec = Image.fromarray(spec_array)
+def pack(texture_dir=None, cache_dir=None):
+    """
+    Preprocess every texture in the texture directory into the texture cache
 
-    spec.putalpha(255)
-    texture.putalpha(255)
+    Returns
+    -------
+    names : list[str]
+        Names of the cached textures
+    """
+    texture_dir = TEXTURE_DIR if texture_dir is None else texture_dir
+    cache_dir = TEXTURE_CACHE_DIR if cache_dir is None else cache_dir
 
-    # Adjust texture/spec size to match
-    if texture.size < size:
-        raise NotImplementedError
+    names = texture_names(texture_dir)
+    for name in names:
+        _cache_texture(_source_dir(name, texture_dir), cache_dir)
 
-    if texture.size != size:
-        texture = texture.crop((0, 0, size[0], size[1]))
-        spec = spec.crop((0, 0, size[0], size[1]))
+    logger.info(f"Cached {len(names)} textures in {cache_dir}")
 
-    return texture, spec
+    return names
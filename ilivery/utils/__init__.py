@@ -1 +1 @@
-from . import img, color, mpl, psd, os
+from . import img, color, mpl, psd, os, raster, noise, cache
@@ -0,0 +1,111 @@
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+@functools.lru_cache(maxsize=256)
+def _file_hash(path, mtime_ns, size):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def file_hash(path):
+    """SHA-256 content hash of a file. Cached by modification time and size, so changed files are hashed again"""
+    stat = path.stat()
+    return _file_hash(path, stat.st_mtime_ns, stat.st_size)
+
+
+def nbytes(value):
+    """
+    Total size in bytes of a value: an array or any object with an nbytes attribute, or a tuple or list of them
+    """
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes(v) for v in value)
+    return getattr(value, "nbytes", 0)
+
+
+class LRUCache:
+    """
+    Thread safe least recently used cache, bounded by the total size of its values in bytes
+
+    Values are expected to be arrays, or tuples of arrays, or other objects with an nbytes attribute. Least
+    recently used entries are evicted once the budget is exceeded, and values larger than the whole budget
+    are not cached at all.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Byte budget
+    """
+
+    def __init__(self, max_bytes):
+        self._entries = OrderedDict()
+        self._max_bytes = max_bytes
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def nbytes(self):
+        """Total size of the cached values, in bytes"""
+        return self._nbytes
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        while self._nbytes > self._max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._nbytes -= size
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = nbytes(value)
+
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+
+            if size > self._max_bytes:
+                return
+
+            self._entries[key] = (value, size)
+            self._nbytes += size
+            self._evict()
+
+    def get_or_create(self, key, create):
+        """Get the value for key, or create it with create() and cache it"""
+        value = self.get(key)
+        if value is None:
+            value = create()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
@@ -20,3 +20,34 @@ def enhance(img, brightness=1, contrast=1):
         img = ImageEnhance.Contrast(img).enhance(contrast)
 
     return img
+
+
+def summed_area_table(mask):
+    """
+    Summed-area table of a boolean mask, padded with a leading row/column of zeros so that
+    `table[r, c]` is the number of set pixels in `mask[:r, :c]`
+    """
+    mask = np.asarray(mask, dtype=bool)
+
+    table = np.zeros((mask.shape[0] + 1, mask.shape[1] + 1), dtype=np.int32)
+    np.cumsum(mask, axis=0, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+
+    return table
+
+
+def boxes_intersect_mask(table, x0, y0, x1, y1):
+    """
+    Vectorized test of whether any pixel of the mask behind a summed-area table falls inside
+    each of the boxes [x0, x1) x [y0, y1), given in image coordinates. Boxes are clipped to the mask.
+    """
+    height, width = table.shape[0] - 1, table.shape[1] - 1
+
+    x0 = np.clip(np.floor(x0), 0, width).astype(int)
+    x1 = np.clip(np.ceil(x1), 0, width).astype(int)
+    y0 = np.clip(np.floor(y0), 0, height).astype(int)
+    y1 = np.clip(np.ceil(y1), 0, height).astype(int)
+
+    count = table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+
+    return count > 0
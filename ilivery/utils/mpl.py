@@ -1,49 +1,77 @@
-import io
-
 from PIL import Image
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
+# Figures are rendered at 100 DPI, so figure inches map to 100 pixels
+DPI = 100
 
-def prep_ax(ax):
-    # Hide grid lines
-    ax.grid(False)
 
-    # Hide axes ticks
-    ax.set_xticks([])
-    ax.set_yticks([])
-    plt.axis("off")
+def _check_size(img, size):
+    # Sometimes, we're off by a pixel in size
+    if img.size != size:
+        # Check that we're off by 1 pixel or less
+        size_diff = [abs(x - y) for x, y in zip(img.size, size)]
+        if max(size_diff) > 1:
+            raise ValueError(f"Requested image size {size}, but got size {img.size}")
+        img = img.resize(size)
 
-    # ax.set_aspect(1)
-    ax.margins(0)
+    return img
 
-    plt.tight_layout(pad=0)
 
+class AggRenderer:
+    """
+    Reusable Agg canvas, drawing artists in pixel coordinates
 
-def get_fig(size):
-    figsize = [s / 100 for s in size]
-    fig, ax = plt.subplots(figsize=figsize)
-    ax.patch.set_alpha(0)
-    return fig, ax
+    The figure is created directly on a FigureCanvasAgg, outside of pyplot, so it is never registered in
+    pyplot's global figure list and is freed as soon as the renderer is. The axes fill the whole
+    transparent canvas, with data coordinates running from (0, 0) at the bottom left to `size`.
 
+    A renderer can be reused for any number of renders. Each render starts from `clear`, draws artists
+    onto the canvas with `draw`, and reads the pixels with `to_img`. Use as a context manager, or call
+    `close`, to release the figure explicitly.
 
-def fig_to_img(fig, size):
-    """Convert a Matplotlib figure to a PIL Image and return it"""
-    buf = io.BytesIO()
+    Parameters
+    ----------
+    size : tuple[int]
+        Image size
+    """
 
-    # Set the figure size, written out at 100DPI
-    # fig.set_figwidth(size[0] / 100)
-    # fig.set_figheight(size[1] / 100)
+    def __init__(self, size):
+        self.size = tuple(size)
 
-    fig.savefig(buf, transparent=True)
-    buf.seek(0)
-    img = Image.open(buf)
+        self._fig = Figure(figsize=[s / DPI for s in size], dpi=DPI)
+        self._canvas = FigureCanvasAgg(self._fig)
+        self._fig.patch.set_alpha(0)
 
-    # Sometimes, we're off by a pixel in size
-    if img.size != size:
-        # Check that we're off by 1 pixel or less
-        size_diff = [abs(x - y) for x, y in zip(img.size, size)]
-        if max(size_diff) > 1:
-            raise ValueError(f"Requested image size {size}, but got size {img.size}")
-        img = img.resize(size)
+        self.ax = self._fig.add_axes((0, 0, 1, 1))
+        self.ax.set_axis_off()
+        self.ax.patch.set_alpha(0)
+        self.ax.set_xlim(0, size[0])
+        self.ax.set_ylim(0, size[1])
 
-    return img
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def clear(self):
+        """Reset the canvas to fully transparent"""
+        self._canvas.draw()
+
+    def draw(self, artist):
+        """Draw an artist onto the canvas, without keeping it in the figure"""
+        self.ax.add_artist(artist)
+        self.ax.draw_artist(artist)
+        artist.remove()
+
+    def to_img(self):
+        """Copy the canvas pixels to a PIL Image, straight from the Agg buffer"""
+        buf = self._canvas.buffer_rgba()
+        img = Image.frombuffer("RGBA", (buf.shape[1], buf.shape[0]), buf, "raw", "RGBA", 0, 1).copy()
+
+        return _check_size(img, self.size)
+
+    def close(self):
+        self._fig.clear()
+        self._canvas = None
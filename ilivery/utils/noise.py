@@ -0,0 +1,185 @@
+import numpy as np
+
+# OpenSimplex 2D constants, matching the opensimplex package
+STRETCH_CONSTANT2 = -0.211324865405187  # (1/Math.sqrt(2+1)-1)/2
+SQUISH_CONSTANT2 = 0.366025403784439  # (Math.sqrt(2+1)-1)/2
+NORM_CONSTANT2 = 47
+
+# Gradients approximating the directions to the vertices of an octagon
+GRADIENTS2 = np.array([5, 2, 2, 5, -5, 2, -2, 5, 5, -2, 2, -5, -5, -2, -2, -5], dtype=np.int64)
+
+_INT64 = 2**64
+
+# Coordinates are quantized to 1/2**16 pixel before hashing, so that tiny floating point differences in how
+# the same point was computed do not change its value
+_HASH_RESOLUTION = 2**16
+
+
+def _lcg(seed):
+    """One step of the opensimplex linear congruential generator, wrapping as a signed 64 bit integer"""
+    seed = (seed * 6364136223846793005 + 1442695040888963407) % _INT64
+    return seed - _INT64 if seed >= _INT64 // 2 else seed
+
+
+def _permutation(seed):
+    """Permutation table for a seed, identical to the one generated by opensimplex"""
+    perm = np.zeros(256, dtype=np.int64)
+    source = list(range(256))
+
+    seed = _lcg(_lcg(_lcg(seed)))
+    for i in range(255, -1, -1):
+        seed = _lcg(seed)
+        r = (seed + 31) % (i + 1)
+        perm[i] = source[r]
+        source[r] = source[i]
+
+    return perm
+
+
+def _mix(h):
+    """splitmix64 finalizer, vectorized over uint64 arrays"""
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def hash_uniform(seed, x, y):
+    """
+    Uniform random values in range [0, 1), as a pure function of (seed, x, y)
+
+    Unlike a stateful generator, each value depends only on its own coordinate, so any subset of
+    points can be evaluated independently, in any order or shape, and get the same values.
+
+    Parameters
+    ----------
+    seed : int
+        Random seed
+    x : np.ndarray
+        x coordinates
+    y : np.ndarray
+        y coordinates, with the same shape as x
+
+    Returns
+    -------
+    values : np.ndarray
+        Random values, with the same shape as x
+    """
+    qx = np.round(np.asarray(x, dtype=float) * _HASH_RESOLUTION).astype(np.int64).view(np.uint64)
+    qy = np.round(np.asarray(y, dtype=float) * _HASH_RESOLUTION).astype(np.int64).view(np.uint64)
+
+    with np.errstate(over="ignore"):
+        h = _mix(np.full(qx.shape, seed % _INT64, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15))
+        h = _mix(h ^ qx)
+        h = _mix(h ^ qy)
+
+    # Top 53 bits as a double in [0, 1)
+    return (h >> np.uint64(11)) * 2.0**-53
+
+
+class SimplexNoise:
+    """
+    Vectorized 2D OpenSimplex noise
+
+    Produces the same values as `opensimplex.noise2` for the same seed, but evaluates whole arrays of
+    points at once. The permutation table is owned by the instance, so instances never touch
+    opensimplex's global state and are safe to evaluate from several threads at once.
+
+    Parameters
+    ----------
+    seed : int
+        Random seed
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+        self._perm = _permutation(seed)
+
+    def _extrapolate(self, xsb, ysb, dx, dy):
+        index = self._perm[(self._perm[xsb & 0xFF] + ysb) & 0xFF] & 0x0E
+        return GRADIENTS2[index] * dx + GRADIENTS2[index + 1] * dy
+
+    def _contribution(self, xsb, ysb, dx, dy):
+        attn = np.maximum(2 - dx * dx - dy * dy, 0)
+        attn *= attn
+        return attn * attn * self._extrapolate(xsb, ysb, dx, dy)
+
+    def noise2(self, x, y):
+        """
+        Evaluate noise at each (x, y) point
+
+        Parameters
+        ----------
+        x : np.ndarray
+            x coordinates
+        y : np.ndarray
+            y coordinates, with the same shape as x
+
+        Returns
+        -------
+        noise : np.ndarray
+            Noise values in range [-1, 1], with the same shape as x
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        # Place input coordinates onto grid
+        stretch_offset = (x + y) * STRETCH_CONSTANT2
+        xs = x + stretch_offset
+        ys = y + stretch_offset
+
+        # Floor to get grid coordinates of rhombus (stretched square) super-cell origin
+        xsb = np.floor(xs)
+        ysb = np.floor(ys)
+
+        # Skew out to get actual coordinates of rhombus origin
+        squish_offset = (xsb + ysb) * SQUISH_CONSTANT2
+        xb = xsb + squish_offset
+        yb = ysb + squish_offset
+
+        # Grid coordinates relative to rhombus origin, and their sum, which determines the region
+        xins = xs - xsb
+        yins = ys - ysb
+        in_sum = xins + yins
+
+        # Positions relative to origin point
+        dx0 = x - xb
+        dy0 = y - yb
+
+        xsb = xsb.astype(np.int64)
+        ysb = ysb.astype(np.int64)
+
+        # Contributions (1,0) and (0,1)
+        value = self._contribution(xsb + 1, ysb + 0, dx0 - 1 - SQUISH_CONSTANT2, dy0 - 0 - SQUISH_CONSTANT2)
+        value += self._contribution(xsb + 0, ysb + 1, dx0 - 0 - SQUISH_CONSTANT2, dy0 - 1 - SQUISH_CONSTANT2)
+
+        # Extra vertex, depending on which triangle (2-simplex) we're in, and which vertices are closest
+        lower = in_sum <= 1
+        zins = np.where(lower, 1 - in_sum, 2 - in_sum)
+        origin_close = np.where(lower, (zins > xins) | (zins > yins), (zins < xins) | (zins < yins))
+        x_larger = xins > yins
+
+        #                           lower triangle                      upper triangle
+        #                 x_larger             else           x_larger           else
+        # origin_close    (+1, -1)             (-1, +1)       (+2, 0)            (0, +2)
+        # else            (+1, +1)                            (0, 0)
+        ext_x = np.select(
+            [lower & origin_close & x_larger, lower & origin_close, lower, origin_close & x_larger, origin_close],
+            [1, -1, 1, 2, 0],
+            0,
+        )
+        ext_y = np.select(
+            [lower & origin_close & x_larger, lower & origin_close, lower, origin_close & x_larger, origin_close],
+            [-1, 1, 1, 0, 2],
+            0,
+        )
+        squish = np.where(lower & origin_close, 0, np.where(lower | origin_close, 2 * SQUISH_CONSTANT2, 0))
+        dx_ext = dx0 - ext_x - squish
+        dy_ext = dy0 - ext_y - squish
+
+        # Origin contribution is (0,0) in the lower triangle, and (1,1) in the upper
+        dx0 = np.where(lower, dx0, dx0 - 1 - 2 * SQUISH_CONSTANT2)
+        dy0 = np.where(lower, dy0, dy0 - 1 - 2 * SQUISH_CONSTANT2)
+        value += self._contribution(xsb + ~lower, ysb + ~lower, dx0, dy0)
+        value += self._contribution(xsb + ext_x, ysb + ext_y, dx_ext, dy_ext)
+
+        return value / NORM_CONSTANT2
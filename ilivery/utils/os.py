@@ -1,7 +1,42 @@
 #!/usr/bin/env python3
 
+import contextlib
+import os
+import tempfile
 from platform import uname
 
+# The process umask, read once at import since reading it means setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 
 def in_wsl() -> bool:
     return "microsoft-standard" in uname().release
+
+
+def write_atomic(path, write):
+    """
+    Write a file atomically, so concurrent readers never see a partial file
+
+    The file is written to a uniquely named temporary file next to it, which is then renamed over it, so
+    concurrent writers of the same path (from any thread or process) never share a temporary file. The
+    temporary file is removed if writing or renaming fails.
+
+    Parameters
+    ----------
+    path : Path
+        File to write
+    write : callable
+        Called with the open (binary) temporary file
+    """
+    f = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False)
+    try:
+        with f:
+            write(f)
+        # Temporary files are private, give the file the permissions of a normally created one
+        os.chmod(f.name, 0o666 & ~_UMASK)
+        os.replace(f.name, path)
+    finally:
+        # Only still there if writing or renaming failed
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(f.name)
@@ -0,0 +1,346 @@
+import numpy as np
+
+# Matplotlib line widths are given in points, and we render at 100 DPI
+POINTS_TO_PX = 100 / 72
+
+
+def _points_in_polygon(x, y, verts):
+    """Even-odd point in polygon test, vectorized over points"""
+    inside = np.zeros(x.shape, dtype=bool)
+
+    for (x0, y0), (x1, y1) in zip(verts, np.roll(verts, -1, axis=0)):
+        if y0 == y1:
+            continue
+        crosses = (y0 > y) != (y1 > y)
+        crosses &= x < (x1 - x0) * (y - y0) / (y1 - y0) + x0
+        inside ^= crosses
+
+    return inside
+
+
+def _distance_to_outline(x, y, verts):
+    """Distance from each point to the closed polygon outline"""
+    dist = np.full(x.shape, np.inf)
+
+    for a, b in zip(verts, np.roll(verts, -1, axis=0)):
+        ab = b - a
+        length2 = ab @ ab
+        if length2 == 0:
+            t = 0
+        else:
+            t = np.clip(((x - a[0]) * ab[0] + (y - a[1]) * ab[1]) / length2, 0, 1)
+        dist = np.minimum(dist, np.hypot(x - (a[0] + t * ab[0]), y - (a[1] + t * ab[1])))
+
+    return dist
+
+
+def polygon_distance(x, y, verts):
+    """
+    Signed distance from each point to a polygon outline, negative inside
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        Point coordinates
+    verts : np.ndarray
+        Polygon verticies, shape (n, 2)
+
+    Returns
+    -------
+    dist : np.ndarray
+        Signed distance, with the same shape as x
+    """
+    verts = np.asarray(verts, dtype=float)
+    x, y = np.broadcast_arrays(x, y)
+
+    dist = _distance_to_outline(x, y, verts)
+    return np.where(_points_in_polygon(x, y, verts), -dist, dist)
+
+
+def polygon_coverage(verts, shape, edgewidth=0, supersample=8):
+    """
+    Anti-aliased coverage of a polygon and its outline on a pixel grid, computed by supersampling
+
+    Parameters
+    ----------
+    verts : np.ndarray
+        Polygon verticies, shape (n, 2), in pixel coordinates (x right, y down) relative to the grid origin
+    shape : tuple[int]
+        Grid shape, (height, width)
+    edgewidth : float
+        Outline width in pixels, centered on the polygon outline
+    supersample : int
+        Samples per pixel, in each direction
+
+    Returns
+    -------
+    face : np.ndarray
+        Fraction of each pixel covered by the polygon, float32 with the given shape
+    edge : np.ndarray
+        Fraction of each pixel covered by the outline
+    """
+    verts = np.asarray(verts, dtype=float)
+    height, width = shape
+
+    x, y = np.meshgrid(
+        (np.arange(width * supersample) + 0.5) / supersample,
+        (np.arange(height * supersample) + 0.5) / supersample,
+    )
+
+    def _downsample(samples):
+        return samples.reshape(height, supersample, width, supersample).mean(axis=(1, 3), dtype=np.float32)
+
+    face = _downsample(_points_in_polygon(x, y, verts))
+
+    if edgewidth > 0:
+        edge = _downsample(_distance_to_outline(x, y, verts) <= edgewidth / 2)
+    else:
+        edge = np.zeros(shape, dtype=np.float32)
+
+    return face, edge
+
+
+def to_rgba(colors, n):
+    """Standardize a single float color, or an array of float colors, to a new (n, 4) RGBA array"""
+    colors = np.array(colors, dtype=np.float32)
+    if colors.ndim == 1:
+        colors = np.tile(colors, (n, 1))
+
+    if colors.shape[1] == 3:
+        colors = np.concatenate([colors, np.ones((n, 1), dtype=np.float32)], axis=1)
+
+    return colors
+
+
+def _cross(a, b):
+    return a[0] * b[1] - a[1] * b[0]
+
+
+def _orientation(starts, ends):
+    """+1 for counterclockwise rounded outlines, -1 for clockwise ones"""
+    outline = np.stack([starts, ends], axis=1).reshape(-1, 2)
+    return np.sign(_cross(outline.T, np.roll(outline, -1, axis=0).T).sum())
+
+
+def _edge_distance(x, y, a, b, orientation):
+    """Distance from each point to the straight edge a -> b, and whether the point is on its inner side"""
+    ab = b - a
+    length2 = ab @ ab
+    t = 0 if length2 == 0 else np.clip(((x - a[0]) * ab[0] + (y - a[1]) * ab[1]) / length2, 0, 1)
+    d = np.hypot(x - (a[0] + t * ab[0]), y - (a[1] + t * ab[1]))
+
+    # Inside is left of each edge for counterclockwise outlines, and right for clockwise ones
+    return d, np.sign(_cross(ab, (x - a[0], y - a[1]))) == orientation
+
+
+def _arc_distance(x, y, c, s, e, r, orientation):
+    """
+    Distance from each point to an arc, infinite outside the arc's wedge, and whether the point is on its
+    inner side
+    """
+    q = (x - c[0], y - c[1])
+    q_norm = np.hypot(*q)
+
+    # Arcs are shorter than a half circle, so their wedge lies between the rays through the arc's end points
+    sweep = np.sign(_cross(s - c, e - c))
+    in_wedge = (np.sign(_cross(s - c, q)) != -sweep) & (np.sign(_cross(q, e - c)) != -sweep)
+
+    # Arcs turning with the outline are convex corners, with the inside within the circle
+    d = np.where(in_wedge, np.abs(q_norm - r), np.inf)
+    return d, (q_norm < r) == (sweep == orientation)
+
+
+def rounded_polygon_distance(x, y, centers, starts, ends, radii):
+    """
+    Signed distance from each point to a rounded polygon outline, negative inside
+
+    The outline is made of circular arcs, one per corner, joined by straight edges from the end of each arc
+    to the start of the next. See ilivery.patches.fillet_corners for the corner geometry.
+
+    The outline is tangent continuous, so the sign is taken from whichever piece is nearest: the side of
+    an edge, or of an arc's circle. Unlike a point in polygon test, this has no ambiguous points away from
+    the outline itself.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        Point coordinates
+    centers, starts, ends : np.ndarray
+        Arc centers, start points and end points, shape (n, 2)
+    radii : np.ndarray
+        Arc radii, shape (n,)
+
+    Returns
+    -------
+    dist : np.ndarray
+        Signed distance, with the same shape as x
+    """
+    dist = np.full(np.shape(x), np.inf)
+    inside = np.zeros(np.shape(x), dtype=bool)
+    orientation = _orientation(starts, ends)
+
+    pieces = [(_arc_distance, arc) for arc in zip(centers, starts, ends, radii)]
+    pieces += [(_edge_distance, (a, b)) for a, b in zip(ends, np.roll(starts, -1, axis=0))]
+    for distance, piece in pieces:
+        d, d_inside = distance(x, y, *piece, orientation)
+        closer = d < dist
+        dist = np.where(closer, d, dist)
+        inside = np.where(closer, d_inside, inside)
+
+    return np.where(inside, -dist, dist)
+
+
+def _arc_points(c, s, e, r, tolerance):
+    """Points along an arc, from s to e, spaced so that the chords between them stay within tolerance of it"""
+    angle = np.arctan2(abs(_cross(s - c, e - c)), (s - c) @ (e - c))
+    step = 2 * np.arccos(1 - tolerance / r) if r > tolerance else np.pi
+    n = max(int(np.ceil(angle / step)), 1)
+
+    # Rotate the start point about the center, in the direction of the arc
+    theta = np.sign(_cross(s - c, e - c)) * angle * np.arange(n + 1) / n
+    (u, v), cos, sin = s - c, np.cos(theta), np.sin(theta)
+    return c + np.stack([u * cos - v * sin, u * sin + v * cos], axis=-1)
+
+
+def _scanline_inside(verts, box):
+    """Even-odd point in polygon test for the pixel centers of a box, one row of edge crossings at a time"""
+    left, upper, right, lower = box
+    width = right - left
+
+    y = np.arange(upper, lower, dtype=np.float32)[:, None] + 0.5
+    (x0, y0), (x1, y1) = verts.T.astype(np.float32), np.roll(verts, -1, axis=0).T.astype(np.float32)
+
+    crosses = (y0 > y) != (y1 > y)
+    rows, edges = np.nonzero(crosses)
+    x = x0[edges] + (y[rows, 0] - y0[edges]) * (x1[edges] - x0[edges]) / (y1[edges] - y0[edges])
+
+    # Toggle from the first pixel center right of each crossing
+    cols = np.clip(np.floor(x - left - 0.5).astype(int) + 1, 0, width)
+    toggles = np.bincount(rows * (width + 1) + cols, minlength=(lower - upper) * (width + 1))
+
+    return (np.cumsum(toggles.reshape(-1, width + 1), axis=1)[:, :width] % 2).astype(bool)
+
+
+def rounded_polygon_pixel_distance(box, centers, starts, ends, radii, band):
+    """
+    Signed distance from each pixel center of a box to a rounded polygon outline, within a band around it
+
+    Distances are only exact within `band` of the outline, which is all an anti-aliased coverage needs
+    (see distance_coverage). Farther pixels are -inf inside and inf outside. Each edge and arc is only
+    evaluated on the part of the box within `band` of it, so the cost scales with the outline length rather
+    than the number of outline pieces times the box area.
+
+    The sign comes from filling the outline row by row, with arcs flattened to within a small tolerance.
+    Only pixels within that tolerance of the outline take the side of the nearest piece, as in
+    rounded_polygon_distance, which is ambiguous where several pieces are equally near (eg. beyond a sharp
+    corner).
+
+    Parameters
+    ----------
+    box : tuple[int]
+        Pixel box (left, upper, right, lower)
+    centers, starts, ends : np.ndarray
+        Arc centers, start points and end points, shape (n, 2)
+    radii : np.ndarray
+        Arc radii, shape (n,)
+    band : float
+        Distance from the outline within which distances are exact
+
+    Returns
+    -------
+    dist : np.ndarray
+        float32 signed distance, shape (lower - upper, right - left)
+    """
+    left, upper, right, lower = box
+    shape = (lower - upper, right - left)
+    orientation = _orientation(starts, ends)
+
+    tolerance = 1 / 64
+    arcs = [_arc_points(*arc, tolerance) for arc in zip(centers, starts, ends, radii)]
+    inside = _scanline_inside(np.concatenate(arcs), box)
+
+    dist = np.full(shape, np.inf, dtype=np.float32)
+    near_inside = np.zeros(shape, dtype=bool)
+
+    def _update(distance, origin, piece_points, piece_args, points):
+        # Pixels within band of the piece, with points padded by the flattening tolerance for arcs
+        (x0, y0), (x1, y1) = points.min(axis=0) - band - tolerance, points.max(axis=0) + band + tolerance
+        i0, j0 = max(int(np.ceil(x0 - 0.5)), left), max(int(np.ceil(y0 - 0.5)), upper)
+        i1, j1 = min(int(np.floor(x1 - 0.5)) + 1, right), min(int(np.floor(y1 - 0.5)) + 1, lower)
+        if i0 >= i1 or j0 >= j1:
+            return
+
+        # Evaluate relative to the piece's first point, so that float32 keeps the geometry of tiny arcs
+        x = (np.arange(i0, i1)[None, :] + 0.5 - origin[0]).astype(np.float32)
+        y = (np.arange(j0, j1)[:, None] + 0.5 - origin[1]).astype(np.float32)
+        piece_points = [(p - origin).astype(np.float32) for p in piece_points]
+        d, d_inside = distance(x, y, *piece_points, *piece_args, orientation)
+
+        window = (slice(j0 - upper, j1 - upper), slice(i0 - left, i1 - left))
+        closer = d < dist[window]
+        dist[window] = np.where(closer, d, dist[window])
+        near_inside[window] = np.where(closer, d_inside, near_inside[window])
+
+    for c, s, e, r, points in zip(centers, starts, ends, radii, arcs):
+        _update(_arc_distance, c, (c, s, e), (r,), points)
+    for a, b in zip(ends, np.roll(starts, -1, axis=0)):
+        _update(_edge_distance, a, (a, b), (), np.stack([a, b]))
+
+    # Pixels within band of the outline are within the window of their nearest piece, so only farther pixels
+    # are missed, and those only need a side
+    inside = np.where(dist <= tolerance, near_inside, inside)
+    dist = np.where(dist <= band, dist, np.inf)
+    return np.where(inside, -dist, dist).astype(np.float32)
+
+
+def distance_coverage(dist, edgewidth=0):
+    """
+    Anti-aliased face and outline coverage from a signed distance, by box filtering each pixel across the outline
+
+    Parameters
+    ----------
+    dist : np.ndarray
+        Signed distance to the outline in pixels, negative inside
+    edgewidth : float
+        Outline width in pixels, centered on the outline
+
+    Returns
+    -------
+    face : np.ndarray
+        Fraction of each pixel inside the shape, float32
+    edge : np.ndarray
+        Fraction of each pixel covered by the outline, float32
+    """
+    face = np.clip(0.5 - dist, 0, 1).astype(np.float32)
+
+    half = edgewidth / 2
+    edge = np.clip(np.minimum(dist + 0.5, half) - np.maximum(dist - 0.5, -half), 0, 1).astype(np.float32)
+
+    return face, edge
+
+
+def colorize_coverage(face, edge, facecolor, edgecolor):
+    """
+    Composite an outline over a face, from coverage buffers and float RGBA colors
+
+    Returns
+    -------
+    data : np.ndarray
+        uint8 RGBA data, with the shape of the coverage buffers plus a trailing channel axis
+    """
+    facecolor = to_rgba(facecolor, 1)[0]
+    edgecolor = to_rgba(edgecolor, 1)[0]
+
+    face_alpha = face * facecolor[3]
+    edge_alpha = edge * edgecolor[3]
+    alpha = edge_alpha + face_alpha * (1 - edge_alpha)
+
+    data = np.empty((*face.shape, 4), dtype=np.uint8)
+    data[..., 3] = np.round(np.clip(alpha, 0, 1) * 255)
+
+    alpha[alpha == 0] = 1
+    for c in range(3):
+        rgb = (edgecolor[c] * edge_alpha + facecolor[c] * face_alpha * (1 - edge_alpha)) / alpha
+        data[..., c] = np.round(np.clip(rgb, 0, 1) * 255)
+
+    return data
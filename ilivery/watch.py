@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import logging
+import time
+from pathlib import Path
+
+from ilivery.build_livery import Livery
+from ilivery.config.livery_config import load_config
+
+logger = logging.getLogger(__name__)
+
+
+def _mtimes(paths):
+    """Modification time of each path, or None for missing paths"""
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = path.stat().st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+
+def watch(config_path, save=False, interval=0.5, max_builds=None):
+    """
+    Rebuild a livery whenever its config, or any file it imports, changes
+
+    The livery is kept between builds, so the template and all asset caches stay loaded, and only the sections
+    and layers whose configs changed are rendered again (see Livery.update). Errors in the config or the build
+    are logged, and the livery is rebuilt once the config is fixed.
+
+    Parameters
+    ----------
+    config_path : Path
+        Livery config
+    save : bool
+        Save the livery to iRacing after each build
+    interval : float
+        Polling interval, in seconds
+    max_builds : int
+        Stop after this many builds (or failed builds). By default, watch until interrupted
+
+    Returns
+    -------
+    livery : Livery
+        The last livery built, or None if no build succeeded
+    """
+    config_path = Path(config_path).resolve()
+
+    livery = None
+    watched = {config_path}
+    mtimes = None
+    builds = 0
+
+    while max_builds is None or builds < max_builds:
+        if mtimes is not None:
+            time.sleep(interval)
+            if _mtimes(watched) == mtimes:
+                continue
+
+        # Snapshot before loading, so edits made during the build trigger another build
+        mtimes = _mtimes(watched)
+        builds += 1
+
+        imports = set()
+        try:
+            config = load_config(config_path, imports)
+        except Exception:
+            logger.exception("Invalid config, watching for changes")
+            config = None
+
+        # Snapshot newly imported files as soon as they are known, before building, so that edits made to them
+        # during the build trigger another build
+        mtimes.update(_mtimes(imports - mtimes.keys()))
+
+        if config is None:
+            # Keep watching the previous imports too, since the config may have failed before importing them
+            watched = watched | imports
+        else:
+            watched = {config_path, *imports}
+
+            try:
+                start = time.perf_counter()
+                if livery is None:
+                    livery = Livery(config, no_cache=True)
+                else:
+                    livery.update(config)
+                livery.build()
+                if save:
+                    livery.save()
+
+                logger.info(f"Built in {time.perf_counter() - start:.2f}s, watching for changes")
+
+            except Exception:
+                logger.exception("Build failed, watching for changes")
+
+        mtimes = {path: mtimes[path] for path in watched}
+
+    return livery
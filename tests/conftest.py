@@ -54,6 +54,26 @@ def _add_grid(image, grid_spacing: int, center_line_thickness: int = 3, alpha: f
     return image
 
 
+@pytest.fixture(autouse=True)
+def cfunc_cache_dir(tmp_path, monkeypatch):
+    """Save color function results under tmp_path, rather than in the working tree"""
+    import importlib
+
+    path = tmp_path / "cfunc_cache"
+    monkeypatch.setattr(importlib.import_module("ilivery.build_livery"), "CFUNC_CACHE_DIR", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def texture_cache_dir(tmp_path, monkeypatch):
+    """Preprocess textures under tmp_path, rather than in the working tree"""
+    from ilivery import textures
+
+    path = tmp_path / "texture_cache"
+    monkeypatch.setattr(textures, "TEXTURE_CACHE_DIR", path)
+    return path
+
+
 @pytest.fixture
 def test_id(request):
     unique_id = request.node.nodeid
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
+import numpy as np
 import pydantic
 
 from ilivery.layer import Layer
 from ilivery.layers import layer_from_config
 from ilivery.config import layer_configs
+from ilivery.patterns.logo import logo_coverage
 
 import pytest
 
@@ -191,3 +193,32 @@ class TestLogoDecalLayer:
         layer = layer_from_config(config, size=(200, 200))
 
         compare_ref_layer(layer)
+
+
+class TestLogoCoverage:
+    def test_cached(self):
+        face, edge = logo_coverage(64, edgeratio=0.1)
+
+        assert logo_coverage(64, edgeratio=0.1)[0] is face
+        assert logo_coverage(64, edgeratio=0.1, pad="circle")[0] is not face
+        assert not face.flags.writeable and not edge.flags.writeable
+
+    def test_coverage(self):
+        face, edge = logo_coverage(64, edgeratio=0.1, pad="CIRCLE")
+
+        assert face.dtype == np.float32 and face.shape == edge.shape
+        assert face.min() >= 0 and face.max() == 1
+        assert edge.min() >= 0 and edge.max() == 1
+
+        # Anti-aliased, rather than binary, coverage along the outline
+        assert ((edge > 0) & (edge < 1)).any()
+
+    def test_no_edge(self):
+        face, edge = logo_coverage(64, pad="CIRCLE")
+
+        assert face.any()
+        assert not edge.any()
+
+    def test_bad_pad(self):
+        with pytest.raises(ValueError):
+            logo_coverage(64, pad="NONE")
@@ -0,0 +1,78 @@
+import numpy as np
+import pydantic
+
+from ilivery.layers import layer_from_config
+from ilivery.config import layer_configs
+
+import pytest
+
+
+class TestGradientLayer:
+    def test_linear(self, compare_ref_layer):
+        config = {
+            "type": "GRADIENT",
+            "cmap": {
+                "type": "LINEAR_SEGMENTED",
+                "colors": [[255, 0, 0], [0, 0, 255]],
+            },
+            "angle": 30,
+            "spec": "MATTE",
+        }
+
+        config = pydantic.TypeAdapter(layer_configs.LayerConfig).validate_python(config)
+        layer = layer_from_config(config, size=(200, 100))
+
+        assert layer.size == (200, 100)
+
+        compare_ref_layer(layer)
+
+    def test_radial(self, compare_ref_layer):
+        config = {
+            "type": "GRADIENT",
+            "gradient": "RADIAL",
+            "cmap": {
+                "type": "LINEAR_SEGMENTED",
+                "colors": [[255, 255, 255], [0, 128, 0], [0, 0, 0]],
+                "segments": [0.3],
+            },
+            "center": [50, 50],
+            "spec_cmap": {
+                "type": "LINEAR_SEGMENTED",
+                "colors": [[0, 0, 0], [255, 255, 255]],
+                "n_levels": 8,
+            },
+        }
+
+        config = pydantic.TypeAdapter(layer_configs.LayerConfig).validate_python(config)
+        layer = layer_from_config(config, size=(200, 200))
+
+        compare_ref_layer(layer)
+
+    def test_direction(self):
+        config = {
+            "type": "GRADIENT",
+            "cmap": {
+                "type": "LINEAR_SEGMENTED",
+                "colors": [[0, 0, 0], [255, 255, 255]],
+            },
+            "angle": 90,
+        }
+
+        config = pydantic.TypeAdapter(layer_configs.LayerConfig).validate_python(config)
+        paint = layer_from_config(config, size=(10, 50)).to_numpy()["paint"]
+
+        # Counterclockwise from the x axis: 90 degrees fades from bottom to top
+        assert (paint[0, :, 0] == 255).all()
+        assert (paint[-1, :, 0] == 0).all()
+        assert (np.diff(paint[:, 0, 0].astype(int)) <= 0).all()
+
+    def test_spec_exclusive(self):
+        config = {
+            "type": "GRADIENT",
+            "cmap": {"type": "LINEAR_SEGMENTED", "colors": [[0, 0, 0], [255, 255, 255]]},
+            "spec": "MATTE",
+            "spec_cmap": {"type": "LINEAR_SEGMENTED", "colors": [[0, 0, 0], [255, 255, 255]]},
+        }
+
+        with pytest.raises(pydantic.ValidationError):
+            pydantic.TypeAdapter(layer_configs.LayerConfig).validate_python(config)
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import importlib
+
 import pydantic
 
 from ilivery.layer import Layer
@@ -143,3 +145,30 @@ class TestPatchLayer:
         layer = layer_from_config(config, size=(200, 200))
 
         compare_ref_layer(layer)
+
+    @pytest.mark.parametrize("axis", ["x", "y"])
+    @pytest.mark.parametrize("offset", [0, 7, -30])
+    @pytest.mark.parametrize("size", [(200, 200), (201, 151)])
+    def test_mirror_patch_raster(self, monkeypatch, axis, offset, size):
+        config = {
+            "type": "PATCH",
+            "vertices": [[10, -20], [60, 5], [15, 40]],
+            "facecolor": [255, 0, 0],
+            "edgecolor": [0, 255, 0],
+            "facespec": [0, 255, 0],
+            "edgespec": [0, 0, 255],
+            "edgewidth": 3,
+            "radii": [0, 8, 3],
+            "mirror_patch": {"axis": axis, "offset": offset},
+        }
+        config = pydantic.TypeAdapter(layer_configs.LayerConfig).validate_python(config)
+
+        flipped = layer_from_config(config, size=size)
+
+        # Flipping the rendered raster matches rendering the mirrored verticies
+        monkeypatch.setattr(
+            importlib.import_module("ilivery.layers.patch_layer"), "_mirror_patch_raster", lambda *args: None
+        )
+        rendered = layer_from_config(config, size=size)
+
+        assert flipped == rendered
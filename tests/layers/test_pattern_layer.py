@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
-#!/usr/bin/env python3
 
+import numpy as np
 import pydantic
+from PIL import Image, ImageDraw
 
+from ilivery.colorfuncs import colorfunc_from_config
+from ilivery.colormaps import colormap_from_config
 from ilivery.layer import Layer
 from ilivery.layers import layer_from_config
-from ilivery.config import layer_configs
+from ilivery.config import color_configs, layer_configs
+from ilivery.patterns import lattice_pattern
+from ilivery.patterns.lattice import Lattice
+from ilivery.patterns.poly_pattern import cull_to_mask
+from ilivery.patterns.triangles import TRIANGLE_LATTICE
 
 import pytest
 
@@ -119,3 +126,255 @@ class TestPatternTriangle:
         layer = layer_from_config(config, size=(200, 200))
 
         compare_ref_layer(layer)
+
+    def test_mask_culling(self):
+        """Culling triangles outside the section mask must not change anything inside the mask"""
+        config = {
+            "type": "PATTERN",
+            "pattern": {
+                "type": "TRIANGLES",
+                "triangle_size": 20,
+                "face_cmap": {
+                    "type": "LINEAR_SEGMENTED",
+                    "colors": [
+                        [255, 0, 0],
+                        [0, 255, 0],
+                    ],
+                },
+                "face_cfunc": {
+                    "type": "GRADIENT",
+                    "direction": [-1, 1],
+                },
+                "edgecolor": [255, 255, 255],
+                "edgewidth": 2,
+            },
+        }
+
+        mask = Image.new(size=(200, 200), mode="RGBA")
+        ImageDraw.Draw(mask).ellipse((20, 60, 100, 140), fill=(0, 0, 0, 255))
+
+        config = pydantic.TypeAdapter(layer_configs.LayerConfig).validate_python(config)
+        layer = layer_from_config(config, size=(200, 200))
+        culled_layer = layer_from_config(config, size=(200, 200), mask=mask)
+
+        assert culled_layer.mask(mask) == layer.mask(mask)
+        # Far from the mask, nothing is drawn
+        assert (culled_layer.to_numpy()["paint"][:, 150:, 3] == 0).all()
+
+    def test_mask_culling_soft_edge(self):
+        """Cells touching only partly transparent (anti-aliased) mask pixels are not culled"""
+        mask = Image.new(size=(100, 100), mode="RGBA")
+        ImageDraw.Draw(mask).rectangle((40, 40, 60, 60), fill=(0, 0, 0, 100))
+
+        centers = np.array([[50.0, 50.0], [10.0, 10.0]])
+        visible = cull_to_mask(centers, size=(100, 100), mask=mask, margin=5)
+
+        assert visible.tolist() == [True, False]
+
+
+class TestPatternHexagon:
+    def test_basic(self, compare_ref_layer):
+        config = {
+            "type": "PATTERN",
+            "pattern": {
+                "type": "HEXAGONS",
+                "hexagon_size": 40,
+                "facecolor": [0, 0, 0],
+                "edgecolor": [255, 255, 255],
+                "edgewidth": 2,
+                "facespec": [255, 0, 0],
+                "angle": 10,
+            },
+        }
+
+        config = pydantic.TypeAdapter(layer_configs.LayerConfig).validate_python(config)
+        layer = layer_from_config(config, size=(200, 200))
+
+        compare_ref_layer(layer)
+
+
+class TestPatternSquare:
+    def test_basic(self, compare_ref_layer):
+        config = {
+            "type": "PATTERN",
+            "pattern": {
+                "type": "SQUARES",
+                "square_size": 30,
+                "face_cmap": {
+                    "type": "LINEAR_SEGMENTED",
+                    "colors": [
+                        [255, 0, 0],
+                        [0, 255, 0],
+                    ],
+                },
+                "face_cfunc": {
+                    "type": "GRADIENT",
+                    "direction": [1, 1],
+                },
+                "edgecolor": [255, 255, 255],
+                "edgewidth": 2,
+                "spacing": 4,
+                "angle": 30,
+            },
+        }
+
+        config = pydantic.TypeAdapter(layer_configs.LayerConfig).validate_python(config)
+        layer = layer_from_config(config, size=(200, 200))
+
+        compare_ref_layer(layer)
+
+
+class TestPatternLattice:
+    def test_matches_squares(self):
+        pattern = {
+            "square_size": 30,
+            "facecolor": [0, 0, 0],
+            "edgecolor": [255, 255, 255],
+            "edgewidth": 2,
+            "angle": 15,
+        }
+        squares = {"type": "PATTERN", "pattern": {"type": "SQUARES", **pattern}}
+        lattice = {
+            "type": "PATTERN",
+            "pattern": {
+                "type": "LATTICE",
+                "cell_size": pattern.pop("square_size"),
+                "vertices": [[0.5, 0.5], [0.5, -0.5], [-0.5, -0.5], [-0.5, 0.5]],
+                "basis": [[1, 0], [0, 1]],
+                **pattern,
+            },
+        }
+
+        adapter = pydantic.TypeAdapter(layer_configs.LayerConfig)
+        squares_layer = layer_from_config(adapter.validate_python(squares), size=(200, 200))
+        lattice_layer = layer_from_config(adapter.validate_python(lattice), size=(200, 200))
+
+        assert squares_layer == lattice_layer
+
+    def test_custom(self, compare_ref_layer):
+        config = {
+            "type": "PATTERN",
+            "pattern": {
+                "type": "LATTICE",
+                "cell_size": 20,
+                "vertices": [[-0.5, -0.25], [0.5, -0.25], [0.5, 0.25], [-0.5, 0.25]],
+                "basis": [[1, 0], [0.5, 0.5]],
+                "facecolor": [0, 0, 255],
+                "edgecolor": [255, 255, 255],
+                "edgewidth": 1,
+            },
+        }
+
+        config = pydantic.TypeAdapter(layer_configs.LayerConfig).validate_python(config)
+        layer = layer_from_config(config, size=(200, 200))
+
+        compare_ref_layer(layer)
+
+    def test_invalid_basis(self):
+        with pytest.raises(ValueError):
+            Lattice(prototype=[[0, 0], [1, 0], [0, 1]], basis=[[1, 1], [2, 2]])
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            {"type": "TRIANGLES", "triangle_size": 20, "facecolor": [0, 0, 255], "edgecolor": [255, 255, 255]},
+            {
+                "type": "TRIANGLES",
+                "triangle_size": 20,
+                "facecolor": [0, 0, 255, 255],
+                "edgecolor": [255, 255, 255, 128],
+            },
+            # Edge only spec, with the default transparent face spec
+            {
+                "type": "TRIANGLES",
+                "triangle_size": 20,
+                "facecolor": [0, 0, 255],
+                "edgecolor": [255, 255, 255],
+                "edgespec": [0, 255, 0],
+            },
+            # Colormapped faces, without outlines
+            {
+                "type": "TRIANGLES",
+                "triangle_size": 20,
+                "face_cmap": {"type": "LINEAR_SEGMENTED", "colors": [[255, 0, 0], [0, 255, 0]]},
+                "face_cfunc": {"type": "GRADIENT", "direction": [-1, 1]},
+            },
+            {
+                "type": "HEXAGONS",
+                "hexagon_size": 30,
+                "face_cmap": {"type": "LINEAR_SEGMENTED", "colors": [[255, 0, 0], [0, 255, 0]]},
+                "face_cfunc": {"type": "GRADIENT", "direction": [-1, 1]},
+            },
+        ],
+    )
+    def test_stamp_rasterizer(self, pattern):
+        pattern = {"edgewidth": 1, "angle": 10, **pattern}
+        adapter = pydantic.TypeAdapter(layer_configs.LayerConfig)
+
+        def _render(pattern):
+            config = adapter.validate_python({"type": "PATTERN", "pattern": pattern})
+            return layer_from_config(config, size=(200, 200)).to_numpy()
+
+        def _premultiplied(data):
+            # Transparent pixels may have any color
+            data = data.astype(float)
+            return np.concatenate([data[..., :3] * data[..., 3:] / 255, data[..., 3:]], axis=-1)
+
+        agg = _render(pattern)
+        stamp = _render({**pattern, "rasterizer": "STAMP"})
+
+        # Pixels near a cell outline, where the rasterizers anti-alias differently (see StampRasterizer)
+        outlines = {key: pattern[key] for key in ["type", "triangle_size", "hexagon_size", "angle"] if key in pattern}
+        near_edge = _render({**outlines, "facecolor": [0, 0, 0, 0], "edgecolor": [0, 0, 0], "edgewidth": 2.5})
+        near_edge = near_edge["paint"][..., 3] > 0
+
+        for image in ["paint", "spec"]:
+            diff = np.abs(_premultiplied(agg[image]) - _premultiplied(stamp[image])).max(axis=-1)
+
+            # Cell interiors match exactly, up to rounding
+            assert diff[~near_edge].max() <= 1
+
+            # Anti-aliased edges may differ, but only slightly on average
+            assert diff[near_edge].mean() < 20
+            assert np.percentile(diff[near_edge], 99) < 100
+
+    @pytest.mark.parametrize("rasterizer", ["AGG", "STAMP"])
+    def test_edgewidth(self, rasterizer):
+        def _edge_alpha(edgewidth):
+            pattern = {
+                "type": "HEXAGONS",
+                "hexagon_size": 30,
+                "edgecolor": [255, 255, 255],
+                "rasterizer": rasterizer,
+            }
+            if edgewidth is not None:
+                pattern["edgewidth"] = edgewidth
+            config = pydantic.TypeAdapter(layer_configs.LayerConfig).validate_python(
+                {"type": "PATTERN", "pattern": pattern}
+            )
+            return layer_from_config(config, size=(200, 200)).to_numpy()["paint"][..., 3].astype(float).sum()
+
+        # Wider outlines cover more of the layer, and the default is matplotlib's default line width
+        assert _edge_alpha(1) < _edge_alpha(3) < _edge_alpha(6)
+        assert _edge_alpha(None) == _edge_alpha(1)
+
+    @pytest.mark.parametrize("rasterizer", ["AGG", "STAMP"])
+    def test_chunked(self, rasterizer):
+        kwargs = {
+            "lattice": TRIANGLE_LATTICE,
+            "cell_size": 20,
+            "size": (200, 200),
+            "angle": 10,
+            "face_cmap": colormap_from_config(
+                color_configs.LinearSegmentedColorMap(type="LINEAR_SEGMENTED", colors=[[255, 0, 0], [0, 255, 0]])
+            ),
+            "face_cfunc": colorfunc_from_config(color_configs.GradientCFunc(type="GRADIENT", direction=[-1, 1])),
+            "edgecolor": [255, 255, 255],
+            "edgewidth": 1,
+            "rasterizer": rasterizer,
+        }
+
+        paint, _ = lattice_pattern(**kwargs)
+        chunked, _ = lattice_pattern(**kwargs, chunk_size=7)
+
+        assert (np.array(paint) == np.array(chunked)).all()
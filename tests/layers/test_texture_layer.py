@@ -9,7 +9,7 @@ import pytest
 
 
 class TestTextureLayer:
-    def test_carbon_fiber(self, compare_ref_layer):
+    def test_carbon_fiber(self, compare_ref_layer, texture_cache_dir):
         config = {
             "type": "TEXTURE",
             "texture": "CARBON_FIBER",
@@ -19,3 +19,6 @@ class TestTextureLayer:
         layer = layer_from_config(config, size=(200, 200))
 
         compare_ref_layer(layer)
+
+        # The texture is preprocessed into the test's cache directory
+        assert len(list(texture_cache_dir.glob("carbon_fiber_2-*.npy"))) == 1
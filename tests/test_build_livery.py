@@ -2,7 +2,9 @@
 import pytest
 
 from ilivery.config.livery_config import LiveryConfig
+from ilivery import build_livery as build_livery_module
 from ilivery.build_livery import build_livery
+from ilivery.layers import layer_from_config
 
 
 class TestBuildLivery:
@@ -169,5 +171,69 @@ class TestBuildLivery:
         compare_ref_layer(livery._livery)
 
 
+def _incremental_config(pos, color=(255, 0, 0)):
+    logo = {
+        "type": "DECAL",
+        "decal": {"type": "LOGO", "size": 40, "facecolor": [0, 0, 255], "edgecolor": [0, 255, 0], "edgeratio": 0.1},
+        "pos": pos,
+        "mirror": None,
+        "rotate": 0,
+    }
+    return LiveryConfig.model_validate(
+        {
+            "template": "test_template",
+            "sections": [
+                {"section": "segments.left", "layers": [{"type": "SOLID", "color": list(color)}, logo]},
+                {"section": "segments.top", "layers": [{"type": "SOLID", "color": [0, 255, 0]}]},
+            ],
+        }
+    )
+
+
 class TestBuildLiveryCaching:
-    pass
+    @pytest.fixture
+    def built_layers(self, monkeypatch):
+        built = []
+
+        def _layer_from_config(config, **kwargs):
+            built.append(config.type)
+            return layer_from_config(config, **kwargs)
+
+        monkeypatch.setattr(build_livery_module, "layer_from_config", _layer_from_config)
+        return built
+
+    def test_incremental(self, built_layers):
+        livery = build_livery(_incremental_config(pos=[0, 0]), no_cache=True)
+        assert built_layers == ["SOLID", "DECAL", "SOLID"]
+
+        # Moving the decal only rebuilds the decal, and the other section is reused
+        built_layers.clear()
+        livery.update(_incremental_config(pos=[20, 10]))
+        livery.build()
+        assert built_layers == ["DECAL"]
+
+        expected = build_livery(_incremental_config(pos=[20, 10]), no_cache=True)
+        assert livery._livery == expected._livery
+
+    def test_unchanged(self, built_layers):
+        livery = build_livery(_incremental_config(pos=[0, 0]), no_cache=True)
+        first = livery._livery
+
+        built_layers.clear()
+        livery.update(_incremental_config(pos=[0, 0]))
+        livery.build()
+
+        assert built_layers == []
+        assert livery._livery == first
+
+    def test_evicted(self, built_layers):
+        livery = build_livery(_incremental_config(pos=[0, 0]), no_cache=True)
+
+        # Layers dropped from the config are not kept, so changing back rebuilds them
+        livery.update(_incremental_config(pos=[0, 0], color=(255, 255, 0)))
+        livery.build()
+        built_layers.clear()
+        livery.update(_incremental_config(pos=[0, 0]))
+        livery.build()
+
+        assert built_layers == ["SOLID"]
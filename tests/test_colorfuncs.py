@@ -73,6 +73,25 @@ class TestUniformNoiseCFunc:
 
         compare_ref_image(image)
 
+    def test_independent_of_order(self):
+        config = {
+            "type": "RANDOM_UNIFORM",
+            "seed": 3,
+        }
+
+        config = pydantic.TypeAdapter(ColorFunction).validate_python(config)
+        cfunc = colorfunc_from_config(config)
+
+        xx, yy = np.meshgrid(np.arange(40) * 1.5, np.arange(30) * 0.5)
+        full = cfunc(xx, yy)
+
+        # Any subset of points, in any order, gets the same values
+        order = np.random.RandomState(0).permutation(xx.size)[:100]
+        subset = cfunc(xx.ravel()[order], yy.ravel()[order])
+
+        assert (subset == full.ravel()[order]).all()
+        assert (cfunc(xx, yy) == full).all()
+
 
 class TestSimplexNoiseCFunc:
     @pytest.mark.parametrize("seed", [0, 42])
@@ -153,3 +172,133 @@ class TestComposedCFunc:
         image = _image_from_cfunc(cfunc)
 
         compare_ref_image(image)
+
+    def test_float32(self):
+        config = {
+            "type": "COMPOSED",
+            "color_functions": [
+                {"type": "GRADIENT", "direction": [0, 1]},
+                {
+                    "type": "COMPOSED",
+                    "color_functions": [
+                        {"type": "SIMPLEX_NOISE", "length_scale": [10, 10]},
+                        {"type": "RANDOM_UNIFORM", "seed": 1},
+                    ],
+                },
+            ],
+            "range": [0.2, 0.8],
+        }
+
+        config = pydantic.TypeAdapter(ColorFunction).validate_python(config)
+        cfunc = colorfunc_from_config(config)
+
+        xx, yy = np.meshgrid(np.arange(50), np.arange(40))
+        out = cfunc(xx, yy)
+
+        assert out.dtype == np.float32
+        assert out.shape == (40, 50)
+
+
+class TestCFuncCache:
+    def test_shared(self, monkeypatch):
+        from ilivery.colorfuncs import CFuncCache, SimplexNoiseCFunc
+
+        noise = {"type": "SIMPLEX_NOISE", "length_scale": [10, 10]}
+        face = {"type": "COMPOSED", "color_functions": [noise, {"type": "GRADIENT", "direction": [0, 1]}]}
+
+        adapter = pydantic.TypeAdapter(ColorFunction)
+        cache = CFuncCache()
+        face_cfunc = colorfunc_from_config(adapter.validate_python(face), cache=cache)
+        spec_cfunc = colorfunc_from_config(adapter.validate_python(noise), cache=cache)
+
+        calls = []
+        evaluate = SimplexNoiseCFunc.evaluate
+        monkeypatch.setattr(SimplexNoiseCFunc, "evaluate", lambda self, x, y: calls.append(1) or evaluate(self, x, y))
+
+        points = np.random.RandomState(0).uniform(0, 100, size=(500, 2))
+        face_vals = face_cfunc(points[:, 0], points[:, 1])
+        spec_vals = spec_cfunc(points[:, 0], points[:, 1])
+
+        # Noise is evaluated once, and shared by both functions
+        assert len(calls) == 1
+        assert (spec_vals == colorfunc_from_config(adapter.validate_python(noise))(points[:, 0], points[:, 1])).all()
+        assert (face_vals == colorfunc_from_config(adapter.validate_python(face))(points[:, 0], points[:, 1])).all()
+
+    def test_content_keyed(self):
+        from ilivery.colorfuncs import CFuncCache
+
+        config = pydantic.TypeAdapter(ColorFunction).validate_python({"type": "GRADIENT", "direction": [1, 0]})
+        cfunc = colorfunc_from_config(config, cache=CFuncCache())
+
+        x = np.arange(10, dtype=float)
+        y = np.zeros(10)
+        first = cfunc(x, y).copy()
+
+        # Points modified in place are evaluated again, not served from the memo
+        x[:] = x[::-1]
+        assert (cfunc(x, y) == first[::-1]).all()
+
+        # Equal points in new arrays share the result
+        assert cfunc(x.copy(), y.copy()) is cfunc(x, y)
+
+    def test_disk(self, tmp_path, monkeypatch):
+        from ilivery.colorfuncs import CFuncCache, SimplexNoiseCFunc
+
+        config = pydantic.TypeAdapter(ColorFunction).validate_python(
+            {"type": "SIMPLEX_NOISE", "length_scale": [10, 10], "seed": 4}
+        )
+        points = np.random.RandomState(0).uniform(0, 100, size=(500, 2))
+
+        expected = colorfunc_from_config(config, cache=CFuncCache(path=tmp_path))(points[:, 0], points[:, 1])
+        assert len(list(tmp_path.glob("*.npy"))) == 1
+
+        # A later build loads the saved field, without evaluating the noise
+        def _evaluate(self, x, y):
+            raise RuntimeError("Noise evaluated")
+
+        monkeypatch.setattr(SimplexNoiseCFunc, "evaluate", _evaluate)
+        cached = colorfunc_from_config(config, cache=CFuncCache(path=tmp_path))(points[:, 0], points[:, 1].copy())
+
+        assert isinstance(cached, np.memmap)
+        assert (cached == expected).all()
+
+        # Different points are a different field
+        with pytest.raises(RuntimeError):
+            colorfunc_from_config(config, cache=CFuncCache(path=tmp_path))(points[:, 0], points[:, 1] + 1)
+
+    def test_prune(self, tmp_path):
+        import os
+
+        from ilivery.colorfuncs import CFuncCache
+
+        config = pydantic.TypeAdapter(ColorFunction).validate_python(
+            {"type": "SIMPLEX_NOISE", "length_scale": [10, 10]}
+        )
+        points = np.random.RandomState(0).uniform(0, 100, size=(500, 2))
+
+        def _evaluate(cache, offset):
+            colorfunc_from_config(config, cache=cache)(points[:, 0] + offset, points[:, 1])
+            path = max(tmp_path.glob("*.npy"), key=lambda p: p.stat().st_mtime_ns)
+            # Spread modification times, for filesystems with coarse timestamps
+            os.utime(path, ns=(0, offset * 10**9))
+            return path
+
+        file_size = None
+        paths = []
+        for offset in range(1, 4):
+            paths.append(_evaluate(CFuncCache(path=tmp_path), offset))
+            file_size = paths[-1].stat().st_size
+
+        # A budget of two files removes the least recently used
+        cache = CFuncCache(path=tmp_path, max_bytes=2 * file_size)
+        cache.prune()
+        assert sorted(tmp_path.glob("*.npy")) == sorted(paths[1:])
+
+        cache.clear()
+        assert not list(tmp_path.glob("*.npy"))
+
+    def test_build_cache_dir(self, cfunc_cache_dir):
+        from ilivery import build_livery
+
+        # Builds save color function results under the test's tmp_path
+        assert build_livery.CFUNC_CACHE_DIR == cfunc_cache_dir
@@ -84,3 +84,40 @@ class TestLinearSegmentedColormap:
         image = _image_from_cmap(cmap)
 
         compare_ref_image(image, grid=None)
+
+    def test_lookup(self):
+        config = {
+            "type": "LINEAR_SEGMENTED",
+            "colors": [
+                [0, 0, 0],
+                [255, 255, 255],
+                [0, 255, 0],
+            ],
+            "segments": [0.25],
+            "n_levels": 32,
+        }
+
+        config = pydantic.TypeAdapter(ColorMap).validate_python(config)
+        cmap = colormap_from_config(config)
+
+        values = np.array([-0.5, 0, 0.2, 0.5, 1, 1.5, np.nan])
+        lut = cmap.lookup(values)
+
+        assert lut.dtype == np.uint8
+        assert lut.shape == (7, 4)
+        assert (lut == np.round(cmap(values) * 255)).all()
+        assert (lut[0] == cmap.lut[0]).all() and (lut[-2] == cmap.lut[-1]).all()
+        assert (lut[-1] == 0).all()
+
+    def test_cached(self):
+        config = {
+            "type": "LINEAR_SEGMENTED",
+            "colors": [
+                [0, 0, 0],
+                [255, 0, 0],
+            ],
+        }
+
+        config = pydantic.TypeAdapter(ColorMap).validate_python(config)
+
+        assert colormap_from_config(config).lut is colormap_from_config(config).lut
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from ilivery import decals
+
+
+@pytest.fixture
+def decal_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(decals, "DECAL_DIR", tmp_path)
+    monkeypatch.setattr(decals, "cache", decals.utils.cache.LRUCache(decals.DECAL_CACHE_BYTES))
+
+    data = np.zeros((20, 40, 4), dtype=np.uint8)
+    data[5:15, 10:30] = (10, 20, 30, 255)
+    Image.fromarray(data).save(tmp_path / "box.png")
+
+    return tmp_path
+
+
+class TestNamedDecal:
+    def test_cached(self, decal_dir):
+        first = decals.named_decal("box", size=(20, None), color=(255, 0, 0), spec=(0, 255, 0))
+        second = decals.named_decal("box", size=(20, None), color=(255, 0, 0), spec=(0, 255, 0))
+
+        assert first == second
+        assert first.size == (20, 10)
+
+        # The decal's mip pyramid, and the rendered decal
+        assert len(decals.cache) == 2
+        assert decals.cache.hits == 1
+
+        # Different parameters are cached separately, resized from the same pyramid
+        decals.named_decal("box", size=(20, None), color=(0, 0, 255), spec=(0, 255, 0))
+        assert len(decals.cache) == 3
+        assert decals.cache.hits == 2
+
+    def test_content_change(self, decal_dir):
+        first = decals.named_decal("box", size=(40, 20))
+
+        data = np.zeros((20, 40, 4), dtype=np.uint8)
+        data[:, :] = (1, 2, 3, 255)
+        Image.fromarray(data).save(decal_dir / "box.png")
+        # Make sure the modification time changes, even on filesystems with coarse timestamps
+        os.utime(decal_dir / "box.png", ns=(0, 10**9))
+
+        second = decals.named_decal("box", size=(40, 20))
+
+        assert np.array(second._paint)[0, 0].tolist() == [1, 2, 3, 255]
+        assert not first == second
+
+    def test_layers_independent(self, decal_dir):
+        first = decals.named_decal("box", size=(40, 20), color=(255, 0, 0))
+        first._paint.paste((0, 0, 255, 255), (0, 0, 40, 20))
+
+        # Writing to one layer's images does not change the cached decal
+        second = decals.named_decal("box", size=(40, 20), color=(255, 0, 0))
+        assert np.array(second._paint)[10, 20].tolist() == [255, 0, 0, 255]
+
+
+class TestDecalAtlas:
+    @pytest.fixture
+    def atlas_dir(self, decal_dir, tmp_path, monkeypatch):
+        atlas_dir = tmp_path / "atlas"
+        monkeypatch.setattr(decals, "DECAL_ATLAS_DIR", atlas_dir)
+        monkeypatch.setattr(decals, "_atlas", None)
+        return atlas_dir
+
+    def test_matches_png(self, decal_dir, atlas_dir):
+        expected = decals.named_decal("box", size=(30, None), color=None, spec=(0, 255, 0))
+
+        atlas = decals.pack(decal_dir, atlas_dir)
+        decals.cache.clear()
+
+        # Decals are cropped to their alpha bounds
+        assert atlas.names() == ["box"]
+        assert np.load(atlas_dir / "pixels.npy").shape == (10 * 20, 4)
+
+        assert decals.named_decal("box", size=(30, None), color=None, spec=(0, 255, 0)) == expected
+
+    def test_repack_on_change(self, decal_dir, atlas_dir):
+        decals.pack(decal_dir, atlas_dir)
+
+        data = np.zeros((20, 40, 4), dtype=np.uint8)
+        data[:, :] = (1, 2, 3, 255)
+        Image.fromarray(data).save(decal_dir / "box.png")
+        os.utime(decal_dir / "box.png", ns=(0, 10**9))
+
+        layer = decals.named_decal("box", size=(40, 20))
+
+        assert np.array(layer._paint)[0, 0].tolist() == [1, 2, 3, 255]
+        assert np.load(atlas_dir / "pixels.npy").shape == (20 * 40, 4)
+
+
+class TestMipPyramid:
+    def test_levels(self):
+        base = Image.new("RGBA", (100, 37), (255, 0, 0, 128))
+        pyramid = decals.MipPyramid(base)
+
+        # Odd sizes round up
+        assert [level.shape[:2] for level in pyramid.levels] == [(19, 50), (10, 25), (5, 13), (3, 7), (2, 4), (1, 2)]
+
+        assert pyramid.level_for((100, 37)) == 0
+        assert pyramid.level_for((50, 18)) == 1
+        assert pyramid.level_for((12, 4)) == 3
+
+    def test_area_average(self):
+        data = np.zeros((4, 4, 4), dtype=np.uint8)
+        data[:2, :2] = (255, 0, 0, 255)
+        pyramid = decals.MipPyramid(Image.fromarray(data))
+
+        # Averaged premultiplied, so transparent pixels do not darken the color
+        level = Image.fromarray(pyramid.levels[1], mode="RGBa").convert("RGBA")
+        assert np.array(level)[0, 0].tolist() == [255, 0, 0, 64]
+
+    def test_resize(self):
+        data = np.zeros((64, 128, 4), dtype=np.uint8)
+        data[16:48, 32:96] = (0, 255, 0, 255)
+        base = Image.fromarray(data)
+        pyramid = decals.MipPyramid(base)
+
+        resized = pyramid.resize((16, 8), load_base=lambda: pytest.fail("full resolution source loaded"))
+
+        # Resized from the exact 8x area average, so the aligned rectangle stays sharp
+        expected = np.zeros((8, 16), dtype=np.uint8)
+        expected[2:6, 4:12] = 255
+        assert (np.array(resized.convert("RGBA"))[:, :, 3] == expected).all()
+
+
+class TestRotateDecal:
+    @pytest.mark.parametrize("angle", [90, 180, 270, -90, 450.0])
+    def test_right_angles_exact(self, decal_dir, angle):
+        decal = decals.named_decal("box", size=(40, 20), color=(255, 0, 0))
+
+        rotated = decals.rotate_decal(decal, angle, key=("box",))
+
+        expected = decal.rotate(angle, expand=True)
+        assert rotated == expected
+        assert len(decals.cache) == 2
+
+    def test_memoized(self, decal_dir):
+        key = decals.named_decal_key("box", size=(40, 20), color=(255, 0, 0))
+        decal = decals.named_decal("box", size=(40, 20), color=(255, 0, 0))
+
+        first = decals.rotate_decal(decal, 25, key=key)
+        hits = decals.cache.hits
+        second = decals.rotate_decal(decal, 25 + 360, key=key)
+
+        assert first == second
+        assert decals.cache.hits == hits + 1
+        assert first == decal.rotate(25, expand=True, resample=Image.Resampling.BICUBIC)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pytest
+
+from ilivery.layer import Layer, SpriteLayer
+
+
+def _sprite(size, color):
+    return Layer.from_color(size, color, spec=(0, 0, 255, 128))
+
+
+class TestComposite:
+    @pytest.mark.parametrize("dest", [(10, 20), (-5, -7), (45, 35), (-20, 0), (60, 60)])
+    def test_clipped_matches_flatten(self, dest):
+        base = _sprite((50, 40), (0, 255, 0, 255))
+        sprite = _sprite((15, 12), (255, 0, 0, 128))
+
+        padded = Layer((50 + 2 * 30, 40 + 2 * 30)).composite(base, dest=(30, 30))
+        padded.composite(sprite, dest=(dest[0] + 30, dest[1] + 30))
+
+        layer = base.copy().composite(sprite, dest=dest)
+
+        # Compositing clipped to the layer is the same as compositing onto a larger canvas and cropping
+        assert layer.size == (50, 40)
+        assert (np.array(layer._paint) == np.array(padded._paint)[30:70, 30:80]).all()
+        assert (np.array(layer._spec) == np.array(padded._spec)[30:70, 30:80]).all()
+
+    def test_flatten_copies(self):
+        base = Layer((20, 20))
+        base.flatten(_sprite((5, 5), (255, 0, 0, 255)))
+
+        assert not np.array(base._paint).any()
+
+
+class TestSpriteLayer:
+    def _sprites(self):
+        layer = SpriteLayer((60, 50))
+        layer.add(_sprite((10, 10), (255, 0, 0, 255)), dest=(5, 5))
+        layer.add(_sprite((20, 8), (0, 0, 255, 128)), dest=(50, 45))
+        return layer
+
+    def test_composite_matches_full_size(self):
+        sprites = self._sprites()
+
+        full_size = Layer((60, 50))
+        for sprite, dest in sprites.sprites:
+            full_size = full_size.flatten(sprite, dest=dest)
+
+        section = _sprite((60, 50), (0, 255, 0, 64))
+        expected = section.flatten(full_size)
+
+        assert section.composite(sprites) == expected
+
+        # The full-size images are still available, for layer operations that need them
+        assert sprites.size == (60, 50)
+        assert sprites == full_size
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from ilivery import output
+
+
+def _image(value):
+    data = np.zeros((32, 48, 4), dtype=np.uint8)
+    data[8:24, 10:30] = (value, 20, 30, 255)
+    return Image.fromarray(data)
+
+
+@pytest.fixture
+def outputs(tmp_path):
+    return {tmp_path / "car_1.tga": _image(10), tmp_path / "car_spec_1.tga": _image(200)}
+
+
+class TestWriteTgas:
+    def test_write(self, outputs, tmp_path):
+        written = output.write_tgas(outputs, manifest_path=tmp_path / "manifest.json")
+
+        assert written == list(outputs)
+        for path, image in outputs.items():
+            assert (np.asarray(Image.open(path)) == np.asarray(image)).all()
+
+        # No temporary files are left behind
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["car_1.tga", "car_spec_1.tga", "manifest.json"]
+
+    def test_unchanged(self, outputs, tmp_path, monkeypatch):
+        manifest_path = tmp_path / "manifest.json"
+        output.write_tgas(outputs, manifest_path=manifest_path)
+
+        def _fail(image):
+            raise AssertionError("Unchanged output was encoded again")
+
+        monkeypatch.setattr(output, "encode_tga", _fail)
+        assert output.write_tgas({path: image.copy() for path, image in outputs.items()}, manifest_path) == []
+
+    def test_changed(self, outputs, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        output.write_tgas(outputs, manifest_path=manifest_path)
+
+        paint_path, spec_path = outputs
+        outputs[paint_path] = _image(50)
+
+        assert output.write_tgas(outputs, manifest_path) == [paint_path]
+        assert np.asarray(Image.open(paint_path))[10, 10, 0] == 50
+
+    def test_modified_file(self, outputs, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        output.write_tgas(outputs, manifest_path=manifest_path)
+
+        # Outputs changed or removed since they were written are written again
+        paint_path, spec_path = outputs
+        paint_path.write_bytes(b"")
+        spec_path.unlink()
+
+        assert output.write_tgas(outputs, manifest_path) == [paint_path, spec_path]
+        assert (np.asarray(Image.open(paint_path)) == np.asarray(outputs[paint_path])).all()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pytest
+
+from ilivery import utils
+from ilivery.patches import fillet_corners, poly_patch_coverage, colorize_patch
+
+
+class TestFilletCorners:
+    def test_square(self):
+        vertices = np.array([[0, 0], [100, 0], [100, 100], [0, 100]])
+
+        centers, starts, ends, radii, clockwise = fillet_corners(vertices, 25)
+
+        assert np.allclose(centers, [[25, 25], [75, 25], [75, 75], [25, 75]])
+        assert np.allclose(starts, [[0, 25], [75, 0], [100, 75], [25, 100]])
+        assert np.allclose(ends, [[25, 0], [100, 25], [75, 100], [0, 75]])
+        assert (radii == 25).all()
+        assert not clockwise.any()
+
+    def test_drops_collinear(self):
+        vertices = np.array([[0, 0], [50, 0], [100, 0], [100, 100], [0, 100], [0, 0]])
+
+        centers, _, _, _, _ = fillet_corners(vertices, [5, 5, 5, 5, 5, 5])
+
+        assert len(centers) == 4
+
+
+class TestRoundedPolygonDistance:
+    def test_square(self):
+        vertices = np.array([[0, 0], [100, 0], [100, 100], [0, 100]])
+        x = np.array([50, 50, -10, 50, 100 + 10 / np.sqrt(2), 80])
+        y = np.array([50, -10, 50, 5, 100 + 10 / np.sqrt(2), 80])
+
+        dist = utils.raster.rounded_polygon_distance(x, y, *fillet_corners(vertices, 20)[:4])
+
+        # Corner distances are measured from the arc, centered at (80, 80)
+        corner = np.hypot(20 + 10 / np.sqrt(2), 20 + 10 / np.sqrt(2)) - 20
+        assert np.allclose(dist, [-50, 10, 10, -5, corner, -20])
+
+    def test_concave_orientation(self):
+        # An L shape, drawn clockwise, with a concave corner at (50, 50)
+        vertices = np.array([[0, 0], [0, 100], [50, 100], [50, 50], [100, 50], [100, 0]])
+        x = np.array([25, 75, 57, 52, 75])
+        y = np.array([75, 25, 57, 52, 75])
+
+        dist = utils.raster.rounded_polygon_distance(x, y, *fillet_corners(vertices, 10)[:4])
+
+        assert dist[0] < 0 and dist[1] < 0
+        # The concave fillet is centered outside the shape, at (60, 60), and fills in the corner
+        assert np.isclose(dist[2], 10 - np.hypot(3, 3))
+        assert np.isclose(dist[3], 10 - np.hypot(8, 8))
+        assert np.isclose(dist[4], 25)
+
+
+class TestRoundedPolygonPixelDistance:
+    @pytest.mark.parametrize(
+        "vertices, radii",
+        [
+            # Clockwise L shape, with a concave corner
+            ([[10, 10], [10, 90], [50, 90], [50, 50], [90, 50], [90, 10]], [0, 4, 2, 1, 3, 2]),
+            # Thin triangle, with sharp corners
+            ([[10, 90], [60, 20], [28, 36]], 0),
+            # Star, with alternating convex and concave corners
+            (
+                [
+                    [50 + r * np.cos(t), 50 + r * np.sin(t)]
+                    for r, t in zip([40, 20] * 6, np.linspace(0, 2 * np.pi, 12, endpoint=False))
+                ],
+                [0, 4, 2, 1, 3, 2] * 2,
+            ),
+        ],
+    )
+    @pytest.mark.parametrize("band", [1, 3])
+    def test_matches_distance(self, vertices, radii, band):
+        arcs = fillet_corners(np.array(vertices), radii)[:4]
+        x, y = np.meshgrid(np.arange(100) + 0.5, np.arange(100) + 0.5)
+
+        expected = utils.raster.rounded_polygon_distance(x, y, *arcs)
+        dist = utils.raster.rounded_polygon_pixel_distance((0, 0, 100, 100), *arcs, band)
+
+        # Exact near the outline, and only signed beyond the band
+        near = np.abs(expected) <= band
+        assert dist.dtype == np.float32
+        assert np.allclose(dist[near], expected[near], atol=1e-3)
+        assert (dist[~near] == np.where(expected[~near] < 0, -np.inf, np.inf)).all()
+
+
+class TestPolyPatchCoverage:
+    def test_bbox(self):
+        vertices = np.array([[10, 10], [30, 10], [30, 20], [10, 20]])
+
+        face, edge, box = poly_patch_coverage(vertices, 0, linewidth=0, size=(100, 100))
+
+        # Only the patch's padded bounding box is evaluated, with y flipped to image rows
+        assert box == (9, 79, 31, 91)
+        assert face.shape == (12, 22)
+        assert np.isclose(face.sum(), 200)
+        assert not edge.any()
+
+    def test_colorize_shared(self):
+        vertices = np.array([[10, 10], [60, 10], [40, 50]])
+        coverage = poly_patch_coverage(vertices, 5, linewidth=2, size=(80, 80))
+
+        paint = np.asarray(colorize_patch(coverage, (80, 80), (255, 0, 0), (0, 255, 0)))
+        spec = np.asarray(colorize_patch(coverage, (80, 80), (0, 0, 255), (10, 20, 30)))
+
+        # Paint and spec are colorized from the same coverage, so have the same shape
+        assert paint.shape == (80, 80, 4)
+        assert (paint[..., 3] == spec[..., 3]).all()
+        assert paint[..., 3].any()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from ilivery import textures
+
+
+def _write_texture(path, value):
+    path.mkdir(parents=True, exist_ok=True)
+    for i, f in enumerate(textures.SOURCE_FILES):
+        data = np.full((16, 24, 3), value + 10 * i, dtype=np.uint8)
+        data[:, :, 1] += 1
+        Image.fromarray(data).save(path / f, quality=100)
+
+
+@pytest.fixture
+def texture_dir(tmp_path):
+    texture_dir = tmp_path / "textures"
+    _write_texture(texture_dir / "plain", 100)
+    (texture_dir / "incomplete").mkdir()
+
+    return texture_dir
+
+
+class TestTextures:
+    def test_names(self, texture_dir):
+        assert textures.texture_names(texture_dir) == ["PLAIN"]
+
+    def test_preprocess(self, texture_dir):
+        data = textures.preprocess(texture_dir / "plain")
+
+        assert data.shape == (2, 16, 24, 4)
+        assert data.dtype == np.uint8
+
+        paint, spec = data
+        assert (paint[..., 3] == 255).all()
+        assert np.allclose(paint[..., 0], 100, atol=1)
+
+        # Metallic from the red channel of spec_metallic, roughness from the green channel of spec_roughness
+        assert np.allclose(spec[..., 0], 110, atol=1)
+        assert np.allclose(spec[..., 1], 121, atol=1)
+        assert (spec[..., 2] == 0).all()
+        assert (spec[..., 3] == 255).all()
+
+    def test_layer(self, texture_dir, tmp_path):
+        texture = textures.load_texture("plain", texture_dir, tmp_path / "cache")
+        layer = texture.layer((10, 8))
+
+        assert texture.size == (24, 16)
+        assert layer.size == (10, 8)
+
+        data = textures.preprocess(texture_dir / "plain")
+        assert (np.asarray(layer._paint) == data[0, :8, :10]).all()
+        assert (np.asarray(layer._spec) == data[1, :8, :10]).all()
+
+    def test_region(self, texture_dir, tmp_path):
+        texture = textures.load_texture("plain", texture_dir, tmp_path / "cache")
+        paint = np.asarray(texture.layer((24, 16))._paint)
+
+        region = np.asarray(texture.layer((5, 4), origin=(7, 3))._paint)
+        assert (region == paint[3:7, 7:12]).all()
+
+    @pytest.mark.parametrize("tiling", ["REPEAT", "MIRROR"])
+    def test_tiling(self, texture_dir, tmp_path, tiling):
+        texture = textures.load_texture("plain", texture_dir, tmp_path / "cache")
+        paint = np.asarray(texture.layer((24, 16))._paint)
+        if tiling == "MIRROR":
+            paint = np.concatenate([paint, paint[::-1]], axis=0)
+            paint = np.concatenate([paint, paint[:, ::-1]], axis=1)
+
+        # Larger than the texture, and straddling tile boundaries
+        layer = texture.layer((100, 70), origin=(-30, 10), tiling=tiling)
+        assert layer.size == (100, 70)
+
+        expected = np.take(
+            np.take(paint, np.arange(10, 80), axis=0, mode="wrap"), np.arange(-30, 70), axis=1, mode="wrap"
+        )
+        assert (np.asarray(layer._paint) == expected).all()
+        assert (np.asarray(layer._spec)[..., 3] == 255).all()
+
+        # Neighbouring regions line up
+        left = texture.layer((40, 70), origin=(-30, 10), tiling=tiling)
+        assert (np.asarray(left._paint) == expected[:, :40]).all()
+
+    def test_cached(self, texture_dir, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "cache"
+        first = textures.load_texture("PLAIN", texture_dir, cache_dir)
+        assert len(list(cache_dir.glob("*.npy"))) == 1
+
+        # Cached textures are never decoded again
+        def _fail(source_dir):
+            raise AssertionError("Texture was decoded again")
+
+        monkeypatch.setattr(textures, "preprocess", _fail)
+        assert textures.load_texture("plain", texture_dir, cache_dir) is first
+
+    def test_changed(self, texture_dir, tmp_path):
+        cache_dir = tmp_path / "cache"
+        first = textures.load_texture("plain", texture_dir, cache_dir)
+
+        _write_texture(texture_dir / "plain", 50)
+        stat = os.stat(texture_dir / "plain" / textures.PAINT_FILE)
+        os.utime(texture_dir / "plain" / textures.PAINT_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        second = textures.load_texture("plain", texture_dir, cache_dir)
+
+        assert second.path != first.path
+        assert np.allclose(np.asarray(second.layer((4, 4))._paint)[..., 0], 50, atol=1)
+
+        # The stale cache file is removed
+        assert list(cache_dir.glob("*.npy")) == [second.path]
+
+    def test_unknown(self, texture_dir, tmp_path):
+        with pytest.raises(ValueError):
+            textures.load_texture("incomplete", texture_dir, tmp_path / "cache")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+import os
+
+import pytest
+
+from ilivery import watch
+from ilivery.config.livery_config import load_config
+
+
+def _touch(path):
+    # Bump the modification time, even on filesystems with coarse timestamps
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    (tmp_path / "color.libsonnet").write_text("[255, 0, 0]")
+    config_path = tmp_path / "livery.jsonnet"
+    config_path.write_text(
+        """
+        local color = import "color.libsonnet";
+        {
+            template: "test_template",
+            sections: [{layers: [{type: "SOLID", color: color}]}],
+        }
+        """
+    )
+    return config_path
+
+
+class TestWatch:
+    def test_load_imports(self, config_path):
+        imports = set()
+        config = load_config(config_path, imports)
+
+        assert config.sections[0].layers[0].color == (255, 0, 0)
+        assert imports == {config_path.parent / "color.libsonnet"}
+
+    def test_rebuild_on_import_change(self, config_path, monkeypatch):
+        edits = [
+            lambda: (config_path.parent / "color.libsonnet").write_text("[0, 0, 255]"),
+            lambda: config_path.write_text(config_path.read_text().replace("layers", "oops")),
+            lambda: config_path.write_text(config_path.read_text().replace("oops", "layers")),
+        ]
+
+        def _sleep(interval):
+            # Edit the config between polls
+            if edits:
+                edits.pop(0)()
+                _touch(config_path)
+
+        monkeypatch.setattr(watch.time, "sleep", _sleep)
+
+        # Initial build, the imported color change, the broken config, and the fixed config
+        livery = watch.watch(config_path, max_builds=4)
+
+        assert livery._livery._paint.getpixel((0, 0)) == (0, 0, 255, 255)
+        assert not edits
+
+    def test_import_edited_during_build(self, config_path, monkeypatch):
+        extra_path = config_path.parent / "extra.libsonnet"
+        extra_path.write_text("[0, 255, 0]")
+
+        def _add_import():
+            config_path.write_text(config_path.read_text().replace('"color.libsonnet"', '"extra.libsonnet"'))
+            _touch(config_path)
+
+        edits = [_add_import]
+        polls = []
+
+        def _sleep(interval):
+            polls.append(interval)
+            if len(polls) > 10:
+                raise RuntimeError("Edit during the build was never picked up")
+            if edits:
+                edits.pop(0)()
+
+        builds = []
+        build = watch.Livery.build
+
+        def _build(livery):
+            builds.append(1)
+            build(livery)
+            # Edit the newly imported file while its first build is running
+            if len(builds) == 2:
+                extra_path.write_text("[255, 255, 0]")
+                _touch(extra_path)
+
+        monkeypatch.setattr(watch.time, "sleep", _sleep)
+        monkeypatch.setattr(watch.Livery, "build", _build)
+
+        # Initial build, the build adding the import, and the rebuild for the edit made during it
+        livery = watch.watch(config_path, max_builds=3)
+
+        assert len(builds) == 3
+        assert livery._livery._paint.getpixel((0, 0)) == (255, 255, 0, 255)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import numpy as np
+
+from ilivery.utils.cache import LRUCache
+
+
+def _value(n):
+    return (np.zeros(n, dtype=np.uint8), None)
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_bytes=300)
+        cache.put("a", _value(100))
+        cache.put("b", _value(100))
+        cache.put("c", _value(100))
+
+        # Using "a" makes "b" the least recently used
+        cache.get("a")
+        cache.put("d", _value(100))
+
+        assert "b" not in cache
+        assert all(key in cache for key in "acd")
+        assert cache.nbytes == 300
+
+    def test_oversize_not_cached(self):
+        cache = LRUCache(max_bytes=100)
+        cache.put("a", _value(50))
+        cache.put("b", _value(200))
+
+        assert "a" in cache and "b" not in cache
+
+    def test_shrink_budget(self):
+        cache = LRUCache(max_bytes=1000)
+        for key in "abcd":
+            cache.put(key, _value(100))
+
+        cache.max_bytes = 250
+
+        assert len(cache) == 2 and "c" in cache and "d" in cache
+
+    def test_get_or_create(self):
+        cache = LRUCache(max_bytes=1000)
+        calls = []
+
+        def _create():
+            calls.append(1)
+            return _value(10)
+
+        first = cache.get_or_create("a", _create)
+        second = cache.get_or_create("a", _create)
+
+        assert first is second
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
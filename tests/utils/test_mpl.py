@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+
+from ilivery import utils
+
+
+class TestAggRenderer:
+    def _square(self):
+        return mpl.patches.Rectangle((10, 20), 30, 40, facecolor=(1, 0, 0, 1), edgecolor="none")
+
+    def test_size(self):
+        with utils.mpl.AggRenderer((123, 45)) as renderer:
+            renderer.clear()
+            assert renderer.to_img().size == (123, 45)
+
+    def test_no_pyplot_figures(self):
+        n_figures = len(plt.get_fignums())
+
+        with utils.mpl.AggRenderer((50, 50)) as renderer:
+            renderer.clear()
+            renderer.draw(self._square())
+            renderer.to_img()
+
+        assert len(plt.get_fignums()) == n_figures
+
+    def test_reuse(self):
+        renderer = utils.mpl.AggRenderer((100, 100))
+
+        renderer.clear()
+        renderer.draw(self._square())
+        first = np.array(renderer.to_img())
+
+        # Clearing discards previously drawn artists
+        renderer.clear()
+        assert not np.array(renderer.to_img())[:, :, 3].any()
+
+        renderer.draw(self._square())
+        assert (np.array(renderer.to_img()) == first).all()
+
+        # y runs up, so the square ends 40 pixels above the bottom of the image
+        rows, cols = np.nonzero(first[:, :, 3] == 255)
+        assert (rows.min(), rows.max(), cols.min(), cols.max()) == (40, 79, 10, 39)
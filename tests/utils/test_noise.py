@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import opensimplex
+import pytest
+
+from ilivery.utils.noise import SimplexNoise
+
+
+class TestSimplexNoise:
+    @pytest.mark.parametrize("seed", [0, 3, 42, -7])
+    def test_matches_opensimplex(self, seed):
+        rng = np.random.default_rng(0)
+        x, y = rng.uniform(-100, 100, size=(2, 1000))
+
+        expected = [opensimplex.OpenSimplex(seed).noise2(xi, yi) for xi, yi in zip(x, y)]
+
+        assert (SimplexNoise(seed).noise2(x, y) == expected).all()
+
+    def test_shape(self):
+        x, y = np.meshgrid(np.arange(20) / 3, np.arange(10) / 3)
+
+        assert SimplexNoise(0).noise2(x, y).shape == (10, 20)
+
+    def test_threads(self):
+        x, y = np.meshgrid(np.arange(100) / 7, np.arange(100) / 7)
+        expected = [SimplexNoise(seed).noise2(x, y) for seed in range(8)]
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda seed: SimplexNoise(seed).noise2(x, y), range(8)))
+
+        for result, exp in zip(results, expected):
+            assert (result == exp).all()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ilivery.utils.os import write_atomic
+
+
+class TestWriteAtomic:
+    def test_write(self, tmp_path):
+        path = tmp_path / "out.bin"
+        write_atomic(path, lambda f: f.write(b"old"))
+        write_atomic(path, lambda f: f.write(b"new"))
+
+        assert path.read_bytes() == b"new"
+        assert list(tmp_path.iterdir()) == [path]
+
+        # Same permissions as a file created with open
+        (tmp_path / "plain.bin").write_bytes(b"")
+        assert path.stat().st_mode == (tmp_path / "plain.bin").stat().st_mode
+
+    def test_concurrent(self, tmp_path):
+        path = tmp_path / "out.bin"
+        contents = [bytes([i]) * 100_000 for i in range(16)]
+
+        # Threads of the same process writing the same path must not share a temporary file
+        with ThreadPoolExecutor(max_workers=len(contents)) as executor:
+            list(executor.map(lambda data: write_atomic(path, lambda f: f.write(data)), contents))
+
+        assert path.read_bytes() in contents
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_failed_write(self, tmp_path):
+        path = tmp_path / "out.bin"
+        path.write_bytes(b"old")
+
+        def _write(f):
+            f.write(b"partial")
+            raise RuntimeError("write failed")
+
+        with pytest.raises(RuntimeError):
+            write_atomic(path, _write)
+
+        # The file is untouched, and the temporary file removed
+        assert path.read_bytes() == b"old"
+        assert list(tmp_path.iterdir()) == [path]